@@ -0,0 +1,210 @@
+"""
+Benchmarks for the hot paths of the NiceHash integration
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks --rigs 10 100 1000 --devices 1 8 16
+
+Each benchmark reports operations per second and the peak memory
+allocated by a single operation.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import tempfile
+from time import perf_counter
+import tracemalloc
+
+import httpx
+
+from custom_components.nicehash.coordinators import MiningRigsDataUpdateCoordinator
+from custom_components.nicehash.history import DeviceHistory
+from custom_components.nicehash.nicehash import (
+    MiningRig,
+    NiceHashPrivateClient,
+    PayoutStore,
+    RequestScheduler,
+    decode_json,
+)
+from custom_components.nicehash.sensor import (
+    create_device_sensors,
+    create_rig_sensors,
+)
+
+from .fake_api import FakeNiceHashAPI, FakeTransport
+from .hass import async_create_hass
+from .payloads import PayloadClient, make_fleet, make_payouts, make_rigs2
+
+
+def measure(operation, min_time):
+    """Operations per second and peak bytes allocated by one operation"""
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    runs = 0
+    start = perf_counter()
+    while True:
+        operation()
+        runs += 1
+        elapsed = perf_counter() - start
+        if elapsed >= min_time:
+            return runs / elapsed, peak
+
+
+def retained_bytes_per_device(num_rigs, devices_per_rig):
+    """Memory held by parsed rigs per device once the raw payload is dropped"""
+    gc.collect()
+    tracemalloc.start()
+    fleet = make_fleet(num_rigs, devices_per_rig)
+    rigs = [MiningRig(rig_data) for rig_data in fleet]
+    del fleet
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rigs
+    return retained / (num_rigs * devices_per_rig)
+
+
+def read_sensors(sensors):
+    for sensor in sensors:
+        sensor.state
+        sensor.device_state_attributes
+
+
+def fleet_benchmarks(hass, loop, num_rigs, devices_per_rig):
+    """(name, operation) pairs for a fleet of the given size"""
+    fleet = make_fleet(num_rigs, devices_per_rig)
+    client = PayloadClient(fleet)
+    coordinator = MiningRigsDataUpdateCoordinator(hass, client)
+    coordinator.data = loop.run_until_complete(coordinator._async_update_data())
+    rigs = list(coordinator.data.get("miningRigs").values())
+    rig_sensors = create_rig_sensors(rigs, coordinator)
+    device_sensors = create_device_sensors(rigs, coordinator)
+
+    def update_coordinator():
+        loop.run_until_complete(coordinator._async_update_data())
+
+    # Nothing changes between updates, so only groups/list is fetched
+    hybrid_coordinator = MiningRigsDataUpdateCoordinator(
+        hass, client, hybrid_refresh=True
+    )
+    hybrid_coordinator.data = loop.run_until_complete(
+        hybrid_coordinator._async_update_data()
+    )
+
+    def update_hybrid_coordinator():
+        loop.run_until_complete(hybrid_coordinator._async_update_data())
+
+    def parse_rigs():
+        for rig_data in fleet:
+            MiningRig(rig_data)
+
+    def get_algorithms():
+        for rig in rigs:
+            rig.get_algorithms()
+
+    history = DeviceHistory()
+    devices = coordinator.data.get("devices")
+    history_clock = iter(range(0, 10**9, 60))
+
+    def add_history():
+        history.add(next(history_clock), devices)
+
+    # Signing, transport and decoding of a rigs2 page, without rate limits
+    api = FakeNiceHashAPI(fleet)
+    api_client = NiceHashPrivateClient(
+        *api.credentials,
+        http_client=httpx.AsyncClient(transport=FakeTransport(api)),
+        scheduler=RequestScheduler(budgets={"mining": (10**9, 10**9)}),
+    )
+
+    def request_rigs2():
+        loop.run_until_complete(api_client.get_mining_rigs())
+
+    # The whole fleet in a single rigs2 body
+    body = json.dumps(make_rigs2(fleet, size=len(fleet))).encode()
+    body_size = f"{len(body) / 1024 / 1024:.1f} MiB"
+
+    return [
+        ("coordinator update", update_coordinator),
+        ("hybrid coordinator update", update_hybrid_coordinator),
+        ("rigs2 request via fake API", request_rigs2),
+        (f"rigs2 json.loads {body_size}", lambda: json.loads(body)),
+        (f"rigs2 decode_json {body_size}", lambda: decode_json(body)),
+        ("MiningRig parse", parse_rigs),
+        ("get_algorithms", get_algorithms),
+        ("DeviceHistory add", add_history),
+        ("create_rig_sensors", lambda: create_rig_sensors(rigs, coordinator)),
+        ("create_device_sensors", lambda: create_device_sensors(rigs, coordinator)),
+        ("rig sensors state", lambda: read_sensors(rig_sensors)),
+        ("device sensors state", lambda: read_sensors(device_sensors)),
+    ]
+
+
+def client_benchmarks():
+    """(name, operation) pairs independent of fleet size"""
+    client = NiceHashPrivateClient(
+        "00000000-0000-0000-0000-000000000000",
+        "00000000-0000-0000-0000-000000000000",
+        "00000000-0000-0000-0000-000000000000" * 2,
+    )
+    payouts = make_payouts(1000).get("list")
+
+    def sign_request():
+        client.get_headers("GET", "/main/api/v2/mining/rigs2", "size=100&page=0")
+
+    def add_payouts():
+        PayoutStore().add(payouts)
+
+    return [
+        ("request signing", sign_request),
+        ("PayoutStore add 1000", add_payouts),
+    ]
+
+
+def report(name, num_rigs, devices_per_rig, ops, peak):
+    print(
+        f"{name:<28} {num_rigs:>6} {devices_per_rig:>4} "
+        f"{ops:>14,.1f} {peak / 1024:>12,.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rigs", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 8])
+    parser.add_argument(
+        "--min-time", type=float, default=0.5, help="seconds to run each benchmark"
+    )
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = loop.run_until_complete(async_create_hass(config_dir))
+
+        print(
+            f"{'benchmark':<28} {'rigs':>6} {'devs':>4} {'ops/s':>14} {'peak KiB':>12}"
+        )
+        for name, operation in client_benchmarks():
+            report(name, 0, 0, *measure(operation, args.min_time))
+        for num_rigs in args.rigs:
+            for devices_per_rig in args.devices:
+                benchmarks = fleet_benchmarks(hass, loop, num_rigs, devices_per_rig)
+                for name, operation in benchmarks:
+                    ops, peak = measure(operation, args.min_time)
+                    report(name, num_rigs, devices_per_rig, ops, peak)
+                retained = retained_bytes_per_device(num_rigs, devices_per_rig)
+                print(
+                    f"{'bytes per parsed device':<28} {num_rigs:>6} "
+                    f"{devices_per_rig:>4} {retained:>14,.1f}"
+                )
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Local stand-in for the NiceHash API, https://api2.nicehash.com
+
+Serves accounts2, rigs2, rig2, groups/list, rigs/payouts, exchangeRate/list
+and time from synthetic payloads or recorded responses, checks the X-Auth
+signature of private endpoints and injects latency, 429s, 5xx and malformed
+bodies. Use it as an httpx transport:
+
+    api = FakeNiceHashAPI(make_fleet(100, 8))
+    http_client = httpx.AsyncClient(transport=FakeTransport(api))
+    client = NiceHashPrivateClient(*api.credentials, http_client=http_client)
+
+or serve it with aiohttp:
+
+    python -m benchmarks.fake_api --rigs 100 --devices 8 --port 8080
+"""
+import argparse
+import asyncio
+from collections import Counter
+from hashlib import sha256
+import hmac
+import json
+import random
+import time
+from urllib.parse import parse_qsl
+
+import httpx
+
+from .payloads import (
+    make_accounts2,
+    make_exchange_rates,
+    make_groups,
+    make_payouts,
+    make_rigs2,
+)
+
+ORGANIZATION_ID = "00000000-0000-0000-0000-000000000001"
+API_KEY = "00000000-0000-0000-0000-000000000002"
+API_SECRET = "00000000-0000-0000-0000-000000000003" * 2
+# Requests signed further than this from the server clock are rejected
+MAX_TIME_SKEW = 5 * 60 * 1000
+TIME_PATH = "/api/v2/time"
+PUBLIC_PATHS = (TIME_PATH, "/main/api/v2/exchangeRate/list")
+
+
+class Faults:
+    """
+    Faults injected into responses, drawn from a seeded random generator
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        rate_limit_ratio=0.0,
+        server_error_ratio=0.0,
+        malformed_ratio=0.0,
+        retry_after=1,
+        endpoints=None,
+        seed=0,
+    ):
+        # Seconds added to every response, plus up to jitter seconds
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.server_error_ratio = server_error_ratio
+        self.malformed_ratio = malformed_ratio
+        self.retry_after = retry_after
+        # Paths faults apply to, e.g. {"/main/api/v2/mining/rigs2"}, None for all
+        self.endpoints = endpoints
+        self.rng = random.Random(seed)
+
+    def get_delay(self):
+        if self.jitter:
+            return self.latency + self.rng.uniform(0, self.jitter)
+        return self.latency
+
+    def get_fault(self, path):
+        """The fault to inject into a response of path, if any"""
+        if self.endpoints is not None and path not in self.endpoints:
+            return None
+        roll = self.rng.random()
+        for fault, ratio in (
+            ("rate_limit", self.rate_limit_ratio),
+            ("server_error", self.server_error_ratio),
+            ("malformed", self.malformed_ratio),
+        ):
+            if roll < ratio:
+                return fault
+            roll -= ratio
+        return None
+
+
+class FakeNiceHashAPI:
+    """
+    NiceHash API endpoints over a mutable synthetic fleet
+    """
+
+    def __init__(
+        self,
+        fleet,
+        num_payouts=42,
+        faults=None,
+        recordings=None,
+        organization_id=ORGANIZATION_ID,
+        key=API_KEY,
+        secret=API_SECRET,
+        clock_offset=0,
+    ):
+        self.fleet = fleet
+        self.accounts = make_accounts2()
+        self.payouts = make_payouts(num_payouts).get("list")
+        self.exchange_rates = make_exchange_rates()
+        self.faults = faults or Faults()
+        # Recorded bodies by "path?query", served instead of synthetic ones
+        self.recordings = recordings or dict()
+        self.organization_id = organization_id
+        self.key = key
+        self.secret = secret
+        # Server time minus local time, in milliseconds
+        self.clock_offset = clock_offset
+        self.requests = Counter()
+        self.rejected = Counter()
+
+    @property
+    def credentials(self):
+        """(organization_id, key, secret) to create a NiceHashPrivateClient"""
+        return self.organization_id, self.key, self.secret
+
+    def get_server_time(self):
+        return int(time.time() * 1000) + self.clock_offset
+
+    async def handle(self, method, path, query="", headers=None, body=b""):
+        """Answer a request with a (status, headers, body) tuple"""
+        self.requests[path] += 1
+        delay = self.faults.get_delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+        if path not in PUBLIC_PATHS:
+            error = self.verify_signature(method, path, query, headers or {}, body)
+            if error is not None:
+                self.rejected[path] += 1
+                return _error(401, error)
+
+        fault = self.faults.get_fault(path)
+        if fault == "rate_limit":
+            retry_after = {"Retry-After": str(self.faults.retry_after)}
+            return 429, retry_after, b'{"error": "Too Many Requests"}'
+        if fault == "server_error":
+            return _error(503, "Service Unavailable")
+
+        key = f"{path}?{query}" if query else path
+        # Server time is always live, a recorded one would be skewed
+        if key in self.recordings and path != TIME_PATH:
+            data = self.recordings[key]
+        else:
+            data = self.get_data(method, path, dict(parse_qsl(query)))
+        if data is None:
+            return _error(404, f"Not Found: {path}")
+
+        # Encoded off the event loop, a real server does not stall the client
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(None, _encode, data)
+        if fault == "malformed":
+            # Cut the body off mid-document, as a dropped connection would
+            content = content[: len(content) // 2]
+        return 200, {"Content-Type": "application/json"}, content
+
+    def verify_signature(self, method, path, query, headers, body):
+        """Why a request is rejected, or None if it is signed correctly"""
+        auth = headers.get("x-auth", "")
+        key, _, signature = auth.partition(":")
+        if key != self.key or not signature:
+            return "Invalid X-Auth"
+        if headers.get("x-organization-id") != self.organization_id:
+            return "Invalid X-Organization-Id"
+        try:
+            xtime = int(headers.get("x-time"))
+        except (TypeError, ValueError):
+            return "Invalid X-Time"
+        if abs(xtime - self.get_server_time()) > MAX_TIME_SKEW:
+            return "Invalid X-Time, too far from server time"
+
+        xnonce = headers.get("x-nonce", "")
+        message = (
+            f"{key}\00{xtime}\00{xnonce}\00\00{self.organization_id}\00\00"
+            f"{method}\00{path}\00{query}"
+        ).encode()
+        if body:
+            message += b"\00" + body
+        expected = hmac.new(self.secret.encode(), message, sha256).hexdigest()
+        if not hmac.compare_digest(expected, signature):
+            return "Invalid X-Auth signature"
+        return None
+
+    def get_data(self, method, path, params):
+        """Synthetic response data, or None for unknown paths"""
+        if method != "GET":
+            return None
+        if path == TIME_PATH:
+            return {"serverTime": self.get_server_time()}
+        if path == "/main/api/v2/exchangeRate/list":
+            return self.exchange_rates
+        if path == "/main/api/v2/accounting/accounts2":
+            return self.accounts
+        if path == "/main/api/v2/mining/rigs2":
+            page = int(params.get("page", 0))
+            return make_rigs2(self.fleet, page, int(params.get("size", 25)))
+        if path.startswith("/main/api/v2/mining/rig2/"):
+            rig_id = path.rsplit("/", 1)[-1]
+            for rig in self.fleet:
+                if rig.get("rigId") == rig_id:
+                    return rig
+            return None
+        if path == "/main/api/v2/mining/groups/list":
+            return make_groups(self.fleet)
+        if path == "/main/api/v2/mining/rigs/payouts":
+            payouts = self.payouts
+            if "beforeTimestamp" in params:
+                before = int(params["beforeTimestamp"])
+                payouts = [p for p in payouts if p.get("created") < before]
+            size = int(params.get("size", 84))
+            return {
+                "list": payouts[:size],
+                "pagination": {"size": size, "page": 0, "totalPageCount": 1},
+            }
+        return None
+
+
+def _encode(data):
+    return json.dumps(data).encode()
+
+
+def _error(status, message):
+    body = json.dumps({"errors": [{"code": status, "message": message}]})
+    return status, {"Content-Type": "application/json"}, body.encode()
+
+
+class FakeTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport answering every request from a FakeNiceHashAPI
+    """
+
+    def __init__(self, api: FakeNiceHashAPI):
+        self.api = api
+
+    async def handle_async_request(self, request):
+        body = await request.aread()
+        status, headers, content = await self.api.handle(
+            request.method,
+            request.url.path,
+            request.url.query.decode(),
+            request.headers,
+            body,
+        )
+        return httpx.Response(status, headers=headers, content=content)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport recording the successful GET responses of another one,
+    e.g. of the live API, for a FakeNiceHashAPI to replay
+    """
+
+    def __init__(self, transport=None):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.recordings = dict()
+
+    async def handle_async_request(self, request):
+        response = await self.transport.handle_async_request(request)
+        if request.method == "GET" and response.status_code == 200:
+            content = await response.aread()
+            query = request.url.query.decode()
+            key = f"{request.url.path}?{query}" if query else request.url.path
+            self.recordings[key] = json.loads(content)
+            return httpx.Response(200, headers=response.headers, content=content)
+        return response
+
+    def save(self, filename):
+        with open(filename, "w") as recordings_file:
+            json.dump(self.recordings, recordings_file, indent=1)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def load_recordings(filename):
+    """Recordings saved by RecordingTransport.save"""
+    with open(filename) as recordings_file:
+        return json.load(recordings_file)
+
+
+def create_app(api: FakeNiceHashAPI):
+    """aiohttp application serving a FakeNiceHashAPI"""
+    from aiohttp import web
+
+    async def handle(request):
+        body = await request.read()
+        status, headers, content = await api.handle(
+            request.method,
+            request.path,
+            request.query_string,
+            {name.lower(): value for name, value in request.headers.items()},
+            body,
+        )
+        return web.Response(status=status, headers=headers, body=content)
+
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", handle)
+    return app
+
+
+def main():
+    from aiohttp import web
+
+    from .payloads import make_fleet
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rigs", type=int, default=10)
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--replay", help="recordings file to serve")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--server-error-ratio", type=float, default=0.0)
+    parser.add_argument("--malformed-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit_ratio=args.rate_limit_ratio,
+        server_error_ratio=args.server_error_ratio,
+        malformed_ratio=args.malformed_ratio,
+        seed=args.seed,
+    )
+    recordings = load_recordings(args.replay) if args.replay else None
+    api = FakeNiceHashAPI(
+        make_fleet(args.rigs, args.devices, args.seed),
+        faults=faults,
+        recordings=recordings,
+    )
+    web.run_app(create_app(api), port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Home Assistant instance for the benchmarks
+"""
+from homeassistant.core import HomeAssistant
+
+
+async def async_create_hass(config_dir) -> HomeAssistant:
+    """
+    Home Assistant instance using config_dir, on any supported version. It
+    binds to the running event loop, so it is created from a coroutine
+    """
+    try:
+        return HomeAssistant(config_dir=config_dir)
+    except TypeError:
+        # Home Assistant before 2023.9 sets the config directory afterwards
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+        return hass
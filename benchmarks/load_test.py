@@ -0,0 +1,279 @@
+"""
+Event loop load test of the mining rigs coordinator and its entities
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.load_test --rigs 12 125 --devices 8
+
+Each poll mutates part of the fleet, refreshes the coordinator through the
+fake NiceHash API and lets it notify every entity, as Home Assistant would.
+Reports the longest event loop stall per poll, CPU per poll and the cost of
+one entity state write, and exits non-zero when a threshold is exceeded.
+
+Larger fleets, up to 10,000 devices, are tracked against a previous run
+rather than fixed thresholds:
+
+    python -m benchmarks.load_test --rigs 1250 --output baseline.json
+    python -m benchmarks.load_test --rigs 1250 --baseline baseline.json
+"""
+import argparse
+import asyncio
+from datetime import timedelta
+import gc
+import json
+import logging
+import statistics
+import tempfile
+import time
+
+from homeassistant.bootstrap import load_registries
+from homeassistant.helpers.entity_platform import EntityPlatform
+from homeassistant.loader import async_setup as async_setup_loader
+import httpx
+
+from custom_components.nicehash.const import DOMAIN
+from custom_components.nicehash.coordinators import MiningRigsDataUpdateCoordinator
+from custom_components.nicehash.nicehash import NiceHashPrivateClient, RequestScheduler
+from custom_components.nicehash.sensor import FleetEntities, create_fleet_sensors
+
+from .fake_api import FakeNiceHashAPI, FakeTransport
+from .hass import async_create_hass
+from .payloads import make_fleet
+
+
+class StallMonitor:
+    """
+    Measures how late a heartbeat task wakes up, i.e. how long the event
+    loop was blocked by other callbacks
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.max_stall = 0.0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.max_stall = max(self.max_stall, loop.time() - expected)
+
+    def reset(self) -> float:
+        """Longest stall since the previous reset"""
+        max_stall = self.max_stall
+        self.max_stall = 0.0
+        return max_stall
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def mutate_fleet(fleet, poll, churn):
+    """Change the status time and device loads of a share of the rigs"""
+    if churn <= 0:
+        return
+    step = max(1, round(1 / churn))
+    for rig in fleet[poll % step :: step]:
+        rig["statusTime"] += 1000
+        for device in rig.get("devices"):
+            device["load"] = (device.get("load") + 7.0) % 100
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_add_entities_to_hass(hass, entities) -> EntityPlatform:
+    """Add entities through a sensor platform, as Home Assistant would"""
+    platform = EntityPlatform(
+        hass=hass,
+        logger=_LOGGER,
+        domain="sensor",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=30),
+        entity_namespace=None,
+    )
+    await platform.async_add_entities(entities)
+    return platform
+
+
+async def async_load_test(hass, num_rigs, devices_per_rig, args):
+    fleet = make_fleet(num_rigs, devices_per_rig)
+    api = FakeNiceHashAPI(fleet)
+    client = NiceHashPrivateClient(
+        *api.credentials,
+        http_client=httpx.AsyncClient(transport=FakeTransport(api)),
+        scheduler=RequestScheduler(budgets={"mining": (10**9, 10**9)}),
+    )
+    coordinator = MiningRigsDataUpdateCoordinator(
+        hass, client, hybrid_refresh=args.hybrid, history=args.history
+    )
+    await coordinator.async_refresh()
+
+    entities = []
+    fleet_entities = FleetEntities(
+        coordinator,
+        lambda new_entities: entities.extend(new_entities),
+        rigs_enabled=True,
+        devices_enabled=True,
+        history_enabled=args.history,
+    )
+    fleet_entities.add_rigs(coordinator.data.get("miningRigs").values())
+    entities.extend(create_fleet_sensors(api.organization_id, coordinator))
+    platform = await async_add_entities_to_hass(hass, entities)
+    # Entities and registries live as long as Home Assistant, full collections
+    # walking them would show up as stalls of whichever poll they hit
+    gc.collect()
+    gc.freeze()
+
+    monitor = StallMonitor()
+    monitor.start()
+    stalls = []
+    cpu_times = []
+    wall_times = []
+    for poll in range(args.polls):
+        mutate_fleet(fleet, poll, args.churn)
+        # Let the heartbeat settle before measuring
+        await asyncio.sleep(monitor.interval * 2)
+        monitor.reset()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        await coordinator.async_refresh()
+        wall_times.append(time.perf_counter() - wall_start)
+        cpu_times.append(time.process_time() - cpu_start)
+        await asyncio.sleep(monitor.interval * 2)
+        stalls.append(monitor.reset())
+    await monitor.stop()
+
+    # Every entity writes its state once, as after a full refresh
+    write_start = time.perf_counter()
+    for entity in entities:
+        entity.async_write_ha_state()
+    write_time = (time.perf_counter() - write_start) / len(entities)
+
+    gc.unfreeze()
+    await platform.async_reset()
+    await client.http_client.aclose()
+
+    return {
+        "rigs": num_rigs,
+        "devices": num_rigs * devices_per_rig,
+        "entities": len(entities),
+        "max_stall_ms": max(stalls) * 1000,
+        "median_stall_ms": statistics.median(stalls) * 1000,
+        "cpu_per_poll_ms": statistics.median(cpu_times) * 1000,
+        "wall_per_poll_ms": statistics.median(wall_times) * 1000,
+        "write_per_entity_us": write_time * 1000000,
+    }
+
+
+# Result keys compared with thresholds and baselines
+CHECKED_METRICS = ("max_stall_ms", "cpu_per_poll_ms", "write_per_entity_us")
+
+
+def check_thresholds(result, args, baseline=None):
+    """
+    Names of the thresholds a result exceeds, the baseline result of the
+    same fleet size replaces the fixed thresholds when given
+    """
+    if baseline is not None:
+        limits = [baseline[key] * (1 + args.tolerance) for key in CHECKED_METRICS]
+    else:
+        limits = [args.max_stall, args.max_cpu, args.max_write]
+    return [key for key, limit in zip(CHECKED_METRICS, limits) if result[key] > limit]
+
+
+def load_baseline(filename):
+    """Results of a previous --output run, by (rigs, devices)"""
+    with open(filename) as baseline_file:
+        results = json.load(baseline_file)
+    return {(result["rigs"], result["devices"]): result for result in results}
+
+
+async def async_main(args):
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_create_hass(config_dir)
+        # Entity sources and registries, which platforms add entities to, and
+        # the integrations Home Assistant reports slow entity writes against
+        async_setup_loader(hass)
+        await load_registries(hass)
+        baselines = load_baseline(args.baseline) if args.baseline else dict()
+        results = []
+        for num_rigs in args.rigs:
+            for devices_per_rig in args.devices:
+                result = await async_load_test(hass, num_rigs, devices_per_rig, args)
+                baseline = baselines.get((result["rigs"], result["devices"]))
+                if args.baseline and baseline is None:
+                    print(f"No baseline for {num_rigs} rigs, using thresholds")
+                result["failures"] = check_thresholds(result, args, baseline)
+                results.append(result)
+                report(result)
+        await hass.async_stop(force=True)
+    return results
+
+
+def report(result):
+    print(
+        f"{result['rigs']:>6} {result['devices']:>7} {result['entities']:>8} "
+        f"{result['max_stall_ms']:>10,.1f} {result['median_stall_ms']:>10,.1f} "
+        f"{result['cpu_per_poll_ms']:>10,.1f} {result['wall_per_poll_ms']:>10,.1f} "
+        f"{result['write_per_entity_us']:>10,.1f} "
+        f"{'FAIL ' + ','.join(result['failures']) if result['failures'] else 'ok'}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rigs", type=int, nargs="+", default=[12, 125])
+    parser.add_argument("--devices", type=int, nargs="+", default=[8])
+    parser.add_argument("--polls", type=int, default=10)
+    parser.add_argument(
+        "--churn", type=float, default=0.1, help="share of rigs changed per poll"
+    )
+    parser.add_argument("--hybrid", action="store_true", help="hybrid refresh")
+    parser.add_argument("--history", action="store_true", help="device history")
+    parser.add_argument(
+        "--max-stall", type=float, default=50, help="milliseconds per poll"
+    )
+    parser.add_argument(
+        "--max-cpu", type=float, default=100, help="CPU milliseconds per poll"
+    )
+    parser.add_argument(
+        "--max-write", type=float, default=50, help="microseconds per entity write"
+    )
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    parser.add_argument(
+        "--baseline", help="results of a previous --output run to compare with"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="share a result may exceed its baseline by",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'rigs':>6} {'devices':>7} {'entities':>8} {'stall ms':>10} "
+        f"{'p50 stall':>10} {'cpu ms':>10} {'wall ms':>10} {'write us':>10}"
+    )
+    results = asyncio.run(async_main(args))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=1)
+
+    if any(result["failures"] for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Synthetic NiceHash API payloads for benchmarking
+
+Shapes follow the rigs2, rig2, groups/list, accounts2, rigs/payouts and
+exchangeRate/list responses of https://api2.nicehash.com
+"""
+import random
+import time
+import uuid
+
+from custom_components.nicehash.const import RIGS_PAGE_SIZE
+
+ALGORITHMS = [
+    ("DAGGERHASHIMOTO", "DaggerHashimoto", "MH", 30.0, 120.0),
+    ("KAWPOW", "KawPow", "MH", 10.0, 40.0),
+    ("OCTOPUS", "Octopus", "MH", 20.0, 80.0),
+    ("RANDOMXMONERO", "RandomXmonero", "kH", 2.0, 15.0),
+]
+DEVICE_NAMES = [
+    "NVIDIA GeForce RTX 3080",
+    "NVIDIA GeForce RTX 3070 Ti",
+    "AMD Radeon RX 6800 XT",
+    "AMD Ryzen 9 5950X 16-Core Processor",
+    "Intel(R) Core(TM) i7-9700K CPU @ 3.60GHz",
+]
+DEVICE_STATUSES = [
+    ("MINING", "Mining", 90),
+    ("BENCHMARKING", "Benchmarking", 2),
+    ("INACTIVE", "Inactive", 4),
+    ("ERROR", "Error", 1),
+    ("DISABLED", "Disabled", 3),
+]
+RIG_STATUSES = [("MINING", 90), ("STOPPED", 5), ("OFFLINE", 4), ("ERROR", 1)]
+
+
+def _weighted(rng, choices):
+    return rng.choices(choices, weights=[choice[-1] for choice in choices])[0]
+
+
+def make_device(rng: random.Random):
+    """A rigs2 device"""
+    status, description, _ = _weighted(rng, DEVICE_STATUSES)
+    algorithm, title, suffix, low, high = rng.choice(ALGORITHMS)
+    core_temperature = rng.randint(40, 85)
+    # Newer firmware packs the hotspot temperature into the upper two bytes
+    hotspot_temperature = core_temperature + rng.randint(0, 15)
+    speeds = []
+    if status == "MINING":
+        speeds.append(
+            {
+                "algorithm": algorithm,
+                "title": title,
+                "speed": f"{rng.uniform(low, high):.8f}",
+                "displaySuffix": suffix,
+                "intensity": "0",
+            }
+        )
+    return {
+        "id": f"{rng.randint(0, 9)}-{uuid.UUID(int=rng.getrandbits(128))}",
+        "name": rng.choice(DEVICE_NAMES),
+        "deviceType": {"enumName": "NVIDIA", "description": "Nvidia"},
+        "status": {"enumName": status, "description": description},
+        "temperature": hotspot_temperature * 65536 + core_temperature,
+        "load": rng.uniform(0, 100),
+        "revolutionsPerMinute": float(rng.randint(0, 3000)),
+        "revolutionsPerMinutePercentage": float(rng.randint(0, 100)),
+        "powerMode": {"enumName": "UNKNOWN", "description": "Unknown"},
+        "powerUsage": rng.uniform(50, 300),
+        "speeds": speeds,
+        "intensity": {"enumName": "LOW", "description": "Low power mode"},
+        "nhqm": "",
+    }
+
+
+def make_rig(rng: random.Random, num_devices: int, index: int):
+    """A rigs2 mining rig"""
+    status, _ = _weighted(rng, RIG_STATUSES)
+    now = int(time.time() * 1000)
+    return {
+        "rigId": f"{uuid.UUID(int=rng.getrandbits(128))}".replace("-", "")[:20],
+        "type": "MANAGED",
+        "name": f"rig-{index:05d}",
+        "statusTime": now - rng.randint(0, 3600000),
+        "joinTime": now // 1000 - rng.randint(0, 86400 * 365),
+        "minerStatus": status,
+        "groupName": "",
+        "unpaidAmount": f"{rng.uniform(0, 0.001):.8f}",
+        "softwareVersions": "NHM/3.0.6.5",
+        "devices": [make_device(rng) for _ in range(num_devices)],
+        "cpuMiningEnabled": False,
+        "cpuExists": True,
+        "stats": [],
+        "profitability": rng.uniform(0, 0.0005),
+        "localProfitability": rng.uniform(0, 0.0005),
+        "rigPowerMode": "UNKNOWN",
+    }
+
+
+def make_fleet(num_rigs: int, devices_per_rig: int, seed=0):
+    """Raw mining rigs for a fleet of num_rigs * devices_per_rig devices"""
+    rng = random.Random(seed)
+    return [make_rig(rng, devices_per_rig, index) for index in range(num_rigs)]
+
+
+def make_rigs2(fleet, page=0, size=RIGS_PAGE_SIZE):
+    """One page of a rigs2 response for a fleet from make_fleet"""
+    total_pages = max(1, -(-len(fleet) // size))
+    return {
+        "totalRigs": len(fleet),
+        "totalProfitability": sum(rig.get("profitability") for rig in fleet),
+        "totalDevices": sum(len(rig.get("devices")) for rig in fleet),
+        "unpaidAmount": "0.00012345",
+        "path": "",
+        "btcAddress": "3Hs2sS9Cy1nQzEaMkR7ojhWBKLbdJx3Dj2",
+        "nextPayoutTimestamp": "2020-07-13T16:00:00Z",
+        "lastPayoutTimestamp": "2020-07-13T12:00:00Z",
+        "miningRigGroups": [],
+        "miningRigs": fleet[page * size : (page + 1) * size],
+        "pagination": {"size": size, "page": page, "totalPageCount": total_pages},
+    }
+
+
+def make_groups(fleet):
+    """A groups/list response with every rig of a fleet in the default group"""
+    rigs = [
+        {
+            "rigId": rig.get("rigId"),
+            "name": rig.get("name"),
+            "status": rig.get("minerStatus"),
+            "statusTime": rig.get("statusTime"),
+        }
+        for rig in fleet
+    ]
+    return {"groups": {"": {"id": "", "name": "", "rigs": rigs, "groups": {}}}}
+
+
+def make_accounts2(num_currencies=10, seed=0):
+    """An accounts2 response"""
+    rng = random.Random(seed)
+    currencies = []
+    for index in range(num_currencies):
+        available = rng.uniform(0, 1)
+        pending = rng.uniform(0, 0.1)
+        currencies.append(
+            {
+                "active": True,
+                "currency": "BTC" if index == 0 else f"C{index:03d}",
+                "totalBalance": f"{available + pending:.8f}",
+                "available": f"{available:.8f}",
+                "pending": f"{pending:.8f}",
+                "btcRate": rng.uniform(0, 0.1),
+                "fiatRate": rng.uniform(0, 50000),
+                "enabled": True,
+            }
+        )
+    total = currencies[0]
+    return {
+        "total": {
+            "currency": "BTC",
+            "totalBalance": total.get("totalBalance"),
+            "available": total.get("available"),
+            "pending": total.get("pending"),
+        },
+        "currencies": currencies,
+    }
+
+
+def make_payouts(num_payouts, seed=0, newest=None):
+    """A rigs/payouts response, newest first, 4 hours apart"""
+    rng = random.Random(seed)
+    newest = newest or int(time.time() * 1000)
+    payouts = []
+    for index in range(num_payouts):
+        amount = rng.uniform(0.00001, 0.001)
+        payouts.append(
+            {
+                "id": f"{uuid.UUID(int=rng.getrandbits(128))}",
+                "created": newest - index * 4 * 3600 * 1000,
+                "currency": {"enumName": "BTC", "description": "BTC"},
+                "amount": f"{amount:.8f}",
+                "metadata": "{}",
+                "accountType": {"enumName": "USER", "description": "User"},
+                "feeAmount": f"{amount * 0.02:.8f}",
+            }
+        )
+    return {
+        "list": payouts,
+        "pagination": {"size": num_payouts, "page": 0, "totalPageCount": 1},
+    }
+
+
+def make_exchange_rates(num_fiat=40, seed=0):
+    """An exchangeRate/list response"""
+    rng = random.Random(seed)
+    rates = []
+    for index in range(num_fiat):
+        to_currency = ["USD", "EUR"][index] if index < 2 else f"F{index:02d}"
+        btc_rate = rng.uniform(1000, 100000)
+        rates.append(
+            {
+                "fromCurrency": "BTC",
+                "toCurrency": to_currency,
+                "exchangeRate": f"{btc_rate:.2f}",
+            }
+        )
+        rates.append(
+            {
+                "fromCurrency": to_currency,
+                "toCurrency": "BTC",
+                "exchangeRate": f"{1 / btc_rate:.12f}",
+            }
+        )
+    return {"list": rates}
+
+
+class PayloadClient:
+    """
+    Serves synthetic payloads through the NiceHashPrivateClient interface
+    """
+
+    organization_id = "benchmark-organization"
+
+    def __init__(self, fleet, num_payouts=42):
+        self.fleet = fleet
+        self.payouts = make_payouts(num_payouts)
+        self.accounts = make_accounts2()
+
+    async def get_accounts(self):
+        return self.accounts
+
+    async def get_mining_rigs(self, page=0, size=RIGS_PAGE_SIZE):
+        return make_rigs2(self.fleet, page, size)
+
+    async def get_mining_rig(self, rig_id):
+        for rig in self.fleet:
+            if rig.get("rigId") == rig_id:
+                return rig
+        raise Exception(f"404: Not Found: rig {rig_id}")
+
+    async def get_mining_groups(self):
+        return make_groups(self.fleet)
+
+    async def get_rig_payouts(self, size=84, before_timestamp=None):
+        payouts = self.payouts.get("list")
+        if before_timestamp is not None:
+            payouts = [p for p in payouts if p.get("created") < before_timestamp]
+        return {"list": payouts[:size]}
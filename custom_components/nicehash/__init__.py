@@ -4,52 +4,107 @@ Integrates NiceHash with Home Assistant
 For more details about this integration, please refer to
 https://github.com/brianberg/ha-nicehash
 """
+import asyncio
+import httpx
+import json
 import logging
 import voluptuous as vol
 
-from homeassistant.const import CONF_DEVICES, CONF_TIMEOUT
+from homeassistant.const import CONF_DEVICES, CONF_NAME, CONF_TIMEOUT
 from homeassistant.core import Config, HomeAssistant
 from homeassistant.helpers import discovery
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.httpx_client import create_async_httpx_client
 from homeassistant.exceptions import PlatformNotReady
+from homeassistant.util.ssl import client_context
 
 from .const import (
     CONF_API_KEY,
     CONF_API_SECRET,
     CONF_CURRENCY,
     CONF_ORGANIZATION_ID,
+    CONF_ORGANIZATIONS,
     CONF_BALANCES_ENABLED,
     CONF_RIGS_ENABLED,
     CONF_DEVICES_ENABLED,
     CONF_PAYOUTS_ENABLED,
+    CONF_HTTP2_ENABLED,
+    CONF_DIAGNOSTICS_ENABLED,
+    CONF_HYBRID_REFRESH_ENABLED,
+    CONF_HISTORY_ENABLED,
     CURRENCY_USD,
+    DEFAULT_NAME,
+    DIAGNOSTICS_FILENAME,
     DOMAIN,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT,
+    ORGANIZATION_STAGGER_PERIOD,
+    SERVICE_DUMP_DIAGNOSTICS,
     STARTUP_MESSAGE,
 )
-from .nicehash import NiceHashPrivateClient
+from .nicehash import (
+    NiceHashPrivateClient,
+    NiceHashPublicClient,
+    RequestMetrics,
+)
 from .coordinators import (
     AccountsDataUpdateCoordinator,
+    ExchangeRatesDataUpdateCoordinator,
     MiningPayoutsDataUpdateCoordinator,
     MiningRigsDataUpdateCoordinator,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-CONFIG_SCHEMA = vol.Schema(
+ORGANIZATION_SCHEMA = vol.Schema(
     {
-        DOMAIN: vol.Schema(
-            {
-                vol.Required(CONF_ORGANIZATION_ID): cv.string,
-                vol.Required(CONF_API_KEY): cv.string,
-                vol.Required(CONF_API_SECRET): cv.string,
-                vol.Required(CONF_CURRENCY, default=CURRENCY_USD): cv.string,
-                vol.Required(CONF_BALANCES_ENABLED, default=False): cv.boolean,
-                vol.Required(CONF_RIGS_ENABLED, default=False): cv.boolean,
-                vol.Required(CONF_DEVICES_ENABLED, default=False): cv.boolean,
-                vol.Required(CONF_PAYOUTS_ENABLED, default=False): cv.boolean,
-            }
-        )
-    },
+        vol.Required(CONF_ORGANIZATION_ID): cv.string,
+        vol.Required(CONF_API_KEY): cv.string,
+        vol.Required(CONF_API_SECRET): cv.string,
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Required(CONF_CURRENCY, default=CURRENCY_USD): cv.string,
+        vol.Required(CONF_BALANCES_ENABLED, default=False): cv.boolean,
+        vol.Required(CONF_RIGS_ENABLED, default=False): cv.boolean,
+        vol.Required(CONF_DEVICES_ENABLED, default=False): cv.boolean,
+        vol.Required(CONF_PAYOUTS_ENABLED, default=False): cv.boolean,
+        vol.Required(CONF_DIAGNOSTICS_ENABLED, default=False): cv.boolean,
+        vol.Required(CONF_HYBRID_REFRESH_ENABLED, default=False): cv.boolean,
+        vol.Required(CONF_HISTORY_ENABLED, default=False): cv.boolean,
+    }
+)
+
+DOMAIN_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_ORGANIZATIONS): vol.All(
+            cv.ensure_list, [ORGANIZATION_SCHEMA]
+        ),
+        vol.Required(CONF_HTTP2_ENABLED, default=False): cv.boolean,
+    }
+)
+
+
+def nest_organizations(config):
+    """
+    Accept a single organization, with the shared options next to its own,
+    or a bare list of organizations
+    """
+    if isinstance(config, list):
+        return {CONF_ORGANIZATIONS: config}
+    if isinstance(config, dict) and CONF_ORGANIZATIONS not in config:
+        organization_config = dict(config)
+        shared_config = {
+            key: organization_config.pop(key)
+            for key in (CONF_HTTP2_ENABLED,)
+            if key in organization_config
+        }
+        return {**shared_config, CONF_ORGANIZATIONS: [organization_config]}
+    return config
+
+
+CONFIG_SCHEMA = vol.Schema(
+    {DOMAIN: vol.All(nest_organizations, DOMAIN_SCHEMA)},
     extra=vol.ALLOW_EXTRA,
 )
 
@@ -60,64 +115,247 @@ async def async_setup(hass: HomeAssistant, config: Config):
         hass.data.setdefault(DOMAIN, {})
         _LOGGER.debug(STARTUP_MESSAGE)
 
-    nicehash_config = config[DOMAIN]
+    organization_configs = config[DOMAIN].get(CONF_ORGANIZATIONS)
+    http2_enabled = config[DOMAIN].get(CONF_HTTP2_ENABLED)
+
+    # One connection pool for every request made by this integration
+    http_client = create_http_client(hass, http2=http2_enabled)
+
+    # Exchange rates are public, so one client and cache serves every organization
+    public_metrics = RequestMetrics()
+    public_client = NiceHashPublicClient(
+        http_client=http_client, metrics=public_metrics
+    )
+
+    hass.data[DOMAIN]["http_client"] = http_client
+    hass.data[DOMAIN]["public_client"] = public_client
+    hass.data[DOMAIN]["public_metrics"] = public_metrics
+    hass.data[DOMAIN]["organizations"] = dict()
+
+    # (coordinator, error message, poll offset) refreshed concurrently below
+    coordinators = []
+
+    balances_enabled = any(
+        org.get(CONF_BALANCES_ENABLED) for org in organization_configs
+    )
+    if balances_enabled:
+        # Exchange rates are cached separately with their own, shorter TTL
+        exchange_rates_coordinator = ExchangeRatesDataUpdateCoordinator(
+            hass, public_client
+        )
+        coordinators.append(
+            (exchange_rates_coordinator, "Unable to get NiceHash exchange rates", 0)
+        )
+        hass.data[DOMAIN]["exchange_rates_coordinator"] = exchange_rates_coordinator
+
+    # Organizations are named after their ID when there is more than one
+    multiple_organizations = len(organization_configs) > 1
+    diagnostics_organization_id = None
+    for index, organization_config in enumerate(organization_configs):
+        organization_id = organization_config.get(CONF_ORGANIZATION_ID)
+        organization_data, organization_coordinators = setup_organization(
+            hass, organization_config, http_client, multiple_organizations
+        )
+        hass.data[DOMAIN]["organizations"][organization_id] = organization_data
+        offset = index * ORGANIZATION_STAGGER_PERIOD / len(organization_configs)
+        for coordinator, error_message in organization_coordinators:
+            # Every poll, not just the first, lands in the organization's slot
+            if multiple_organizations:
+                coordinator.set_poll_slot(offset, ORGANIZATION_STAGGER_PERIOD)
+            coordinators.append((coordinator, error_message, offset))
+        # Shared diagnostics are reported by a single organization
+        if diagnostics_organization_id is None and organization_data.get(
+            "diagnostics_enabled"
+        ):
+            diagnostics_organization_id = organization_id
+            organization_data["shared_diagnostics_enabled"] = True
+
+    # Coordinators restored from a snapshot refresh in the background, in
+    # their organization's slot, so entities are created without waiting
+    restored = await asyncio.gather(
+        *[coordinator.async_restore_snapshot() for coordinator, _, _ in coordinators]
+    )
+    cold_coordinators = []
+    for (coordinator, error_message, offset), is_restored in zip(
+        coordinators, restored
+    ):
+        if is_restored:
+            _LOGGER.debug(f"Restored {coordinator.name} snapshot")
+            hass.async_create_task(async_refresh_after(coordinator, offset))
+        else:
+            cold_coordinators.append((coordinator, error_message))
+
+    # Entities need data to be created, so cold coordinators refresh at once
+    await asyncio.gather(
+        *[coordinator.async_refresh() for coordinator, _ in cold_coordinators]
+    )
+
+    for coordinator, error_message in cold_coordinators:
+        if not coordinator.last_update_success:
+            _LOGGER.error(error_message)
+            raise PlatformNotReady
+
+    async def async_dump_diagnostics(call):
+        path = hass.config.path(DIAGNOSTICS_FILENAME)
+        diagnostics = get_diagnostics(hass.data[DOMAIN])
+        await hass.async_add_executor_job(write_diagnostics, path, diagnostics)
+        _LOGGER.info(f"NiceHash diagnostics written to {path}")
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_DUMP_DIAGNOSTICS, async_dump_diagnostics
+    )
+
+    for organization_id in hass.data[DOMAIN]["organizations"]:
+        await discovery.async_load_platform(
+            hass, "sensor", DOMAIN, {"organization_id": organization_id}, config
+        )
+
+    return True
+
+
+def create_http_client(hass: HomeAssistant, http2=False):
+    """
+    Create a long-lived, pooled HTTP client to share between NiceHash clients,
+    closed by Home Assistant when it stops
+    """
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            _LOGGER.warning("HTTP/2 requires the h2 package, falling back to HTTP/1.1")
+            http2 = False
+
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    # Home Assistant sets its own pool limits on the client, so ours are set
+    # on the transport, which reuses Home Assistant's cached SSL context
+    transport = httpx.AsyncHTTPTransport(
+        verify=client_context(), http2=http2, limits=limits
+    )
+    return create_async_httpx_client(
+        hass, http2=http2, timeout=HTTP_TIMEOUT, transport=transport
+    )
+
+
+def setup_organization(
+    hass: HomeAssistant, organization_config, http_client, name_by_id=False
+):
+    """Client, options and coordinators of a single organization"""
     # Configuration
-    organization_id = nicehash_config.get(CONF_ORGANIZATION_ID)
-    api_key = nicehash_config.get(CONF_API_KEY)
-    api_secret = nicehash_config.get(CONF_API_SECRET)
+    organization_id = organization_config.get(CONF_ORGANIZATION_ID)
+    default_name = f"{DEFAULT_NAME} {organization_id}" if name_by_id else DEFAULT_NAME
+    name = organization_config.get(CONF_NAME, default_name)
+    api_key = organization_config.get(CONF_API_KEY)
+    api_secret = organization_config.get(CONF_API_SECRET)
     # Options
-    currency = nicehash_config.get(CONF_CURRENCY).upper()
-    balances_enabled = nicehash_config.get(CONF_BALANCES_ENABLED)
-    rigs_enabled = nicehash_config.get(CONF_RIGS_ENABLED)
-    devices_enabled = nicehash_config.get(CONF_DEVICES_ENABLED)
-    payouts_enabled = nicehash_config.get(CONF_PAYOUTS_ENABLED)
-
-    client = NiceHashPrivateClient(organization_id, api_key, api_secret)
-
-    hass.data[DOMAIN]["organization_id"] = organization_id
-    hass.data[DOMAIN]["client"] = client
-    hass.data[DOMAIN]["currency"] = currency
-    hass.data[DOMAIN]["balances_enabled"] = balances_enabled
-    hass.data[DOMAIN]["rigs_enabled"] = rigs_enabled
-    hass.data[DOMAIN]["devices_enabled"] = devices_enabled
-    hass.data[DOMAIN]["payouts_enabled"] = payouts_enabled
+    currency = organization_config.get(CONF_CURRENCY).upper()
+    balances_enabled = organization_config.get(CONF_BALANCES_ENABLED)
+    rigs_enabled = organization_config.get(CONF_RIGS_ENABLED)
+    devices_enabled = organization_config.get(CONF_DEVICES_ENABLED)
+    payouts_enabled = organization_config.get(CONF_PAYOUTS_ENABLED)
+    diagnostics_enabled = organization_config.get(CONF_DIAGNOSTICS_ENABLED)
+    hybrid_refresh_enabled = organization_config.get(CONF_HYBRID_REFRESH_ENABLED)
+    history_enabled = organization_config.get(CONF_HISTORY_ENABLED)
+
+    # Each organization has its own API key, rate limits and request metrics
+    metrics = RequestMetrics()
+    client = NiceHashPrivateClient(
+        organization_id,
+        api_key,
+        api_secret,
+        http_client=http_client,
+        metrics=metrics,
+    )
+
+    data = dict()
+    data["organization_id"] = organization_id
+    data["name"] = name
+    data["client"] = client
+    data["metrics"] = metrics
+    data["currency"] = currency
+    data["balances_enabled"] = balances_enabled
+    data["rigs_enabled"] = rigs_enabled
+    data["devices_enabled"] = devices_enabled
+    data["payouts_enabled"] = payouts_enabled
+    data["diagnostics_enabled"] = diagnostics_enabled
+    data["history_enabled"] = history_enabled
+    data["shared_diagnostics_enabled"] = False
+
+    # (coordinator, error message) pairs
+    coordinators = []
 
     # Accounts
     if balances_enabled:
-        _LOGGER.debug("Account balances enabled, fetching accounts...")
+        _LOGGER.debug(f"Account balances enabled for {organization_id}")
         accounts_coordinator = AccountsDataUpdateCoordinator(hass, client)
-        await accounts_coordinator.async_refresh()
-
-        if not accounts_coordinator.last_update_success:
-            _LOGGER.error("Unable to get NiceHash accounts")
-            raise PlatformNotReady
-
-        hass.data[DOMAIN]["accounts_coordinator"] = accounts_coordinator
+        coordinators.append((accounts_coordinator, "Unable to get NiceHash accounts"))
+        data["accounts_coordinator"] = accounts_coordinator
 
     # Payouts
     if payouts_enabled:
-        _LOGGER.debug("Payouts enabled, fetching payouts data...")
+        _LOGGER.debug(f"Payouts enabled for {organization_id}")
         payouts_coordinator = MiningPayoutsDataUpdateCoordinator(hass, client)
-        await payouts_coordinator.async_refresh()
-
-        if not payouts_coordinator.last_update_success:
-            _LOGGER.error("Unable to get NiceHash mining payouts")
-            raise PlatformNotReady
-
-        hass.data[DOMAIN]["payouts_coordinator"] = payouts_coordinator
+        coordinators.append(
+            (payouts_coordinator, "Unable to get NiceHash mining payouts")
+        )
+        data["payouts_coordinator"] = payouts_coordinator
 
     # Rigs
     if rigs_enabled or devices_enabled:
-        _LOGGER.debug("Rigs or devices enabled, fetching rigs...")
-        rigs_coordinator = MiningRigsDataUpdateCoordinator(hass, client)
-        await rigs_coordinator.async_refresh()
+        _LOGGER.debug(f"Rigs or devices enabled for {organization_id}")
+        rigs_coordinator = MiningRigsDataUpdateCoordinator(
+            hass,
+            client,
+            hybrid_refresh=hybrid_refresh_enabled,
+            history=history_enabled and devices_enabled,
+        )
+        coordinators.append((rigs_coordinator, "Unable to get NiceHash mining rigs"))
+        data["rigs_coordinator"] = rigs_coordinator
 
-        if not rigs_coordinator.last_update_success:
-            _LOGGER.error("Unable to get NiceHash mining rigs")
-            raise PlatformNotReady
+    return data, coordinators
 
-        hass.data[DOMAIN]["rigs_coordinator"] = rigs_coordinator
 
-    await discovery.async_load_platform(hass, "sensor", DOMAIN, {}, config)
+async def async_refresh_after(coordinator, delay):
+    if delay:
+        await asyncio.sleep(delay)
+    await coordinator.async_refresh()
 
-    return True
+
+def get_coordinator_diagnostics(data):
+    return {
+        key: coordinator.get_diagnostics()
+        for key, coordinator in data.items()
+        if key.endswith("_coordinator")
+    }
+
+
+def get_diagnostics(data):
+    """Request metrics, scheduler stats and coordinator timings"""
+    public_client = data.get("public_client")
+    organizations = dict()
+    for organization_id, organization_data in data.get("organizations").items():
+        client = organization_data.get("client")
+        organizations[organization_id] = {
+            "requests": organization_data.get("metrics").as_dict(),
+            "scheduler": client.scheduler.stats,
+            "coalesced": client.in_flight.coalesced,
+            "time_offset_ms": client.time_offset,
+            "coordinators": get_coordinator_diagnostics(organization_data),
+        }
+    return {
+        "public": {
+            "requests": data.get("public_metrics").as_dict(),
+            "scheduler": public_client.scheduler.stats,
+            "coalesced": public_client.in_flight.coalesced,
+            "coordinators": get_coordinator_diagnostics(data),
+        },
+        "organizations": organizations,
+    }
+
+
+def write_diagnostics(path, diagnostics):
+    with open(path, "w") as diagnostics_file:
+        json.dump(diagnostics, diagnostics_file, indent=2, default=str)
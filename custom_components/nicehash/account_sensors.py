@@ -19,7 +19,10 @@ from .const import (
     ICON_CURRENCY_USD,
     NICEHASH_ATTRIBUTION,
 )
-from .coordinators import AccountsDataUpdateCoordinator
+from .coordinators import (
+    AccountsDataUpdateCoordinator,
+    ExchangeRatesDataUpdateCoordinator,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,11 +38,15 @@ class BalanceSensor(Entity):
         organization_id: str,
         currency: str,
         balance_type=BALANCE_TYPE_AVAILABLE,
+        exchange_rates_coordinator: ExchangeRatesDataUpdateCoordinator = None,
+        organization_name: str = DEFAULT_NAME,
     ):
         """Initialize the sensor"""
         self.coordinator = coordinator
+        self.exchange_rates_coordinator = exchange_rates_coordinator
         self.currency = currency
         self.organization_id = organization_id
+        self.organization_name = organization_name
         self.balance_type = balance_type
         self._available = 0.00
         self._pending = 0.00
@@ -50,7 +57,9 @@ class BalanceSensor(Entity):
     def name(self):
         """Sensor name"""
         balance_type = self.balance_type[0].upper() + self.balance_type[1:]
-        return f"{DEFAULT_NAME} {balance_type} Account Balance {self.currency}"
+        return (
+            f"{self.organization_name} {balance_type} Account Balance {self.currency}"
+        )
 
     @property
     def unique_id(self):
@@ -65,7 +74,12 @@ class BalanceSensor(Entity):
     @property
     def available(self):
         """Whether sensor is available"""
-        return self.coordinator.last_update_success
+        if self.currency != CURRENCY_BTC:
+            return (
+                self.coordinator.data_available
+                and self.exchange_rates_coordinator.data_available
+            )
+        return self.coordinator.data_available
 
     @property
     def state(self):
@@ -81,8 +95,9 @@ class BalanceSensor(Entity):
             self._available = available
             self._total_balance = total_balance
         else:
-            exchange_rates = self.coordinator.data.get("exchange_rates")
-            exchange_rate = exchange_rates.get(f"{CURRENCY_BTC}-{self.currency}")
+            exchange_rate = self.exchange_rates_coordinator.get_rate(
+                CURRENCY_BTC, self.currency
+            )
             self._pending = round(pending * exchange_rate, 2)
             self._available = round(available * exchange_rate, 2)
             self._total_balance = round(total_balance * exchange_rate, 2)
@@ -114,6 +129,7 @@ class BalanceSensor(Entity):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "total": self._total_balance,
             "available": self._available,
             "pending": self._pending,
@@ -125,6 +141,13 @@ class BalanceSensor(Entity):
         self.async_on_remove(
             self.coordinator.async_add_listener(self.async_write_ha_state)
         )
+        # Fiat balances also follow exchange rates, which refresh more often
+        if self.currency != CURRENCY_BTC:
+            self.async_on_remove(
+                self.exchange_rates_coordinator.async_add_listener(
+                    self.async_write_ha_state
+                )
+            )
 
     async def async_update(self):
         """Update entity"""
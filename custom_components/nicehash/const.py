@@ -26,6 +26,7 @@ PLATFORMS = [SENSOR]
 
 
 # Configuration and options
+CONF_ORGANIZATIONS = "organizations"
 CONF_API_KEY = "api_key"
 CONF_API_SECRET = "api_secret"
 CONF_ORGANIZATION_ID = "organization_id"
@@ -34,6 +35,10 @@ CONF_BALANCES_ENABLED = "balances"
 CONF_RIGS_ENABLED = "rigs"
 CONF_DEVICES_ENABLED = "devices"
 CONF_PAYOUTS_ENABLED = "payouts"
+CONF_HTTP2_ENABLED = "http2"
+CONF_DIAGNOSTICS_ENABLED = "diagnostics"
+CONF_HYBRID_REFRESH_ENABLED = "hybrid_refresh"
+CONF_HISTORY_ENABLED = "history"
 
 # Defaults
 DEFAULT_NAME = NAME
@@ -53,6 +58,41 @@ If you have any issues with this you need to open an issue here:
 # NiceHash
 NICEHASH_API_URL = "https://api2.nicehash.com"
 NICEHASH_ATTRIBUTION = "Data provided by NiceHash"
+# HTTP connection pool
+HTTP_MAX_CONNECTIONS = 10
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+# Keep idle connections open across the one minute rig poll
+HTTP_KEEPALIVE_EXPIRY = 120
+HTTP_TIMEOUT = 30
+# Response bodies at least this large (bytes) are decoded in an executor
+JSON_EXECUTOR_THRESHOLD = 512 * 1024
+# Rate limit budgets per endpoint family: (requests per second, burst)
+RATE_LIMIT_BUDGETS = {
+    "accounting": (1, 5),
+    "exchangeRate": (1, 5),
+    "mining": (5, 20),
+}
+RATE_LIMIT_DEFAULT_BUDGET = (1, 5)
+# Seconds to back off after a 429 without a Retry-After header
+RATE_LIMIT_DEFAULT_RETRY_AFTER = 10
+# Longer Retry-After values fail the request instead of stalling the update
+RATE_LIMIT_MAX_RETRY_AFTER = 60
+RATE_LIMIT_MAX_RETRIES = 3
+# Samples kept per metric for latency and duration percentiles
+METRICS_MAX_SAMPLES = 100
+# Endpoints with a latency sensor when diagnostics are enabled, public ones
+# are shared and reported by the first organization with diagnostics enabled
+DIAGNOSTICS_ENDPOINTS = ["accounts2", "rigs2", "payouts"]
+DIAGNOSTICS_PUBLIC_ENDPOINTS = ["exchangeRate"]
+DIAGNOSTICS_FILENAME = "nicehash_diagnostics.json"
+SERVICE_DUMP_DIAGNOSTICS = "dump_diagnostics"
+# Seconds between clock offset syncs with the NiceHash server time
+TIME_SYNC_INTERVAL = 30 * 60
+# Rigs per rigs2 page, remaining pages are fetched concurrently
+RIGS_PAGE_SIZE = 100
+# Seconds the polls of multiple organizations are spread over, each
+# organization polls in its own slot of every period
+ORGANIZATION_STAGGER_PERIOD = 10
 # Currency
 CURRENCY_BTC = "BTC"
 CURRENCY_USD = "USD"
@@ -77,5 +117,32 @@ DEVICE_LOAD = "device-load"
 DEVICE_RPM = "device-rpm"
 # Payout types
 PAYOUT_USER = "USER"
+# Payouts kept in the local payout store
+PAYOUTS_MAX_STORED = 1000
+# (window name, window seconds) of the earnings estimated from payouts
+EARNINGS_WINDOWS = (
+    ("24h", 24 * 60 * 60),
+    ("7d", 7 * 24 * 60 * 60),
+    ("30d", 30 * 24 * 60 * 60),
+)
+# Device readings kept in history, by MiningRigDevice attribute
+HISTORY_METRICS = ("speed", "temperature", "load", "rpm")
+# (window name, window seconds, buckets per window)
+HISTORY_WINDOWS = (("1h", 60 * 60, 12), ("24h", 24 * 60 * 60, 48))
+# Time constant of the device readings moving average, in seconds
+HISTORY_EWMA_TIME_CONSTANT = 15 * 60
+DEVICE_HISTORY_LABELS = {
+    "speed": "Speed",
+    "temperature": "Temperature",
+    "load": "Load",
+    "rpm": "RPM",
+}
+# Not Celsius because then HA might convert to Fahrenheit
+DEVICE_HISTORY_UNITS = {"temperature": "C", "load": "%", "rpm": "RPM"}
+# Storage
+STORAGE_VERSION = 1
+# Minimum seconds between coordinator snapshot writes, a pending snapshot is
+# also written when Home Assistant stops
+SNAPSHOT_SAVE_INTERVAL = 5 * 60
 # Magic numbers
 MAX_TWO_BYTES = 65536
@@ -1,10 +1,13 @@
 """
 NiceHash Data Update Coordinators
 """
-from datetime import timedelta
+import asyncio
+from datetime import datetime, timedelta
 import logging
+import time
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
@@ -12,18 +15,186 @@ from homeassistant.helpers.update_coordinator import (
 
 from .const import (
     CURRENCY_BTC,
+    DEVICE_STATUS_BENCHMARKING,
+    DEVICE_STATUS_ERROR,
+    DEVICE_STATUS_PENDING,
     DOMAIN,
+    EARNINGS_WINDOWS,
+    SNAPSHOT_SAVE_INTERVAL,
+    STORAGE_VERSION,
+)
+from .earnings import EarningsEstimator
+from .fleet import FleetChanges, FleetStatistics
+from .history import DeviceHistory, MetricHistory
+from .nicehash import (
+    MiningRig,
+    MetricSamples,
+    MiningRigDevice,
+    NiceHashPrivateClient,
+    NiceHashPublicClient,
+    PayoutStore,
 )
-from .nicehash import NiceHashPrivateClient, NiceHashPublicClient
 
 SCAN_INTERVAL_RIGS = timedelta(minutes=1)
+# Poll faster while rigs are transitioning, back off while nothing changes
+SCAN_INTERVAL_RIGS_TRANSITIONING = timedelta(seconds=20)
+SCAN_INTERVAL_RIGS_MAX = timedelta(minutes=5)
+# Polls a transitioning status is polled fast for, after that it is stuck
+TRANSITIONING_MAX_POLLS = 3
 SCAN_INTERVAL_ACCOUNTS = timedelta(minutes=60)
+SCAN_INTERVAL_EXCHANGE_RATES = timedelta(minutes=5)
 SCAN_INTERVAL_PAYOUTS = timedelta(minutes=60)
+# NiceHash pays out every 4 hours, poll shortly after the next one is due
+PAYOUT_PERIOD = timedelta(hours=4)
+PAYOUT_GRACE_PERIOD = timedelta(minutes=10)
+SCAN_INTERVAL_PAYOUTS_OVERDUE = timedelta(minutes=15)
+# Payout periods missed before an overdue payout is polled for as usual
+PAYOUT_MAX_MISSED_PERIODS = 2
+# Payouts per page on the first sync, 6 (per day) * 7 days
+PAYOUTS_INITIAL_SYNC_SIZE = 42
+# Payouts per page when syncing payouts newer than the newest stored one
+PAYOUTS_SYNC_PAGE_SIZE = 10
+# Hybrid refresh still downloads the whole fleet periodically, to pick up
+# device readings that change without a rig status change
+SCAN_INTERVAL_RIGS_FULL = timedelta(minutes=15)
+# Above this share of changed rigs, one rigs2 pass is cheaper than rig2 calls
+HYBRID_MAX_CHANGED_RATIO = 0.5
+
+TRANSITIONING_STATUSES = {
+    DEVICE_STATUS_BENCHMARKING,
+    DEVICE_STATUS_ERROR,
+    DEVICE_STATUS_PENDING,
+}
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class AccountsDataUpdateCoordinator(DataUpdateCoordinator):
+class NiceHashDataUpdateCoordinator(DataUpdateCoordinator):
+    """
+    Records update and listener fan-out durations of a coordinator and
+    persists its last good data, so it can start from it after a restart
+    """
+
+    def __init__(self, hass: HomeAssistant, *args, snapshot_key=None, **kwargs):
+        """Initialize"""
+        self.update_duration = MetricSamples()
+        self.fan_out_duration = MetricSamples()
+        self.update_failures = 0
+        # Data restored from a snapshot is stale until the first live update
+        self.stale = False
+        self._snapshot_store = None
+        self._snapshot_due = None
+        # (offset, period) in seconds, polls start offset seconds into a period
+        self._poll_slot = None
+        if snapshot_key is not None:
+            self._snapshot_store = Store(
+                hass, STORAGE_VERSION, f"{DOMAIN}.{snapshot_key}.snapshot"
+            )
+
+        super().__init__(hass, *args, **kwargs)
+        # Interval the coordinator wants, update_interval moves it into its slot
+        self.poll_interval = self.update_interval
+
+    def set_poll_slot(self, offset, period):
+        """
+        Start every poll about offset seconds into a period, so coordinators
+        with different slots of the same period never poll together
+        """
+        self._poll_slot = (offset, period)
+
+    async def _async_update_data(self):
+        """Fetch data with the update method, timing how long it takes"""
+        start = time.perf_counter()
+        try:
+            data = await super()._async_update_data()
+        except Exception:
+            self.update_failures += 1
+            raise
+        finally:
+            self.update_duration.add(time.perf_counter() - start)
+            self.update_interval = self._slot_interval(self.poll_interval)
+
+        self.stale = False
+        if self._snapshot_store is not None:
+            self._async_schedule_snapshot(data)
+        return data
+
+    def _slot_interval(self, interval: timedelta) -> timedelta:
+        """Interval moved to the nearest start of the poll slot"""
+        if self._poll_slot is None:
+            return interval
+        offset, period = self._poll_slot
+        due = time.monotonic() + interval.total_seconds()
+        shift = (offset - due + period / 2) % period - period / 2
+        return interval + timedelta(seconds=shift)
+
+    @callback
+    def _async_schedule_snapshot(self, data):
+        """
+        Persist the latest data about once per SNAPSHOT_SAVE_INTERVAL
+
+        Delayed saves restart their timer on every call, so calls between two
+        writes aim at the same due time, which then writes the latest data.
+        """
+        now = time.monotonic()
+        if self._snapshot_due is None or now >= self._snapshot_due:
+            self._snapshot_due = now + SNAPSHOT_SAVE_INTERVAL
+            delay = 0
+        else:
+            delay = self._snapshot_due - now
+        self._snapshot_store.async_delay_save(lambda: self._snapshot_data(data), delay)
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the data persisted before the last restart, marked stale"""
+        if self._snapshot_store is None:
+            return False
+        try:
+            snapshot = await self._snapshot_store.async_load()
+            if not snapshot:
+                return False
+            self.data = self._restore_data(snapshot)
+        except Exception as e:
+            _LOGGER.warning(f"Unable to restore {self.name} snapshot: {e}")
+            return False
+
+        self.stale = True
+        return True
+
+    @property
+    def data_available(self) -> bool:
+        """
+        Whether entities have data to show, restored data stays available
+        until the first live update succeeds
+        """
+        return self.last_update_success or self.stale
+
+    def _snapshot_data(self, data):
+        """JSON serializable snapshot of the coordinator's data"""
+        return data
+
+    def _restore_data(self, snapshot):
+        """Coordinator data from a snapshot"""
+        return snapshot
+
+    @callback
+    def async_update_listeners(self):
+        """Notify listeners, timing the fan-out of every refresh"""
+        start = time.perf_counter()
+        super().async_update_listeners()
+        self.fan_out_duration.add(time.perf_counter() - start)
+
+    def get_diagnostics(self):
+        return {
+            "last_update_success": self.last_update_success,
+            "update_interval": str(self.poll_interval),
+            "update_failures": self.update_failures,
+            "stale": self.stale,
+            "update_duration_ms": self.update_duration.as_dict(1000),
+            "fan_out_duration_ms": self.fan_out_duration.as_dict(1000),
+        }
+
+
+class AccountsDataUpdateCoordinator(NiceHashDataUpdateCoordinator):
     """Manages fetching accounts data from NiceHash API"""
 
     def __init__(self, hass: HomeAssistant, client: NiceHashPrivateClient):
@@ -32,75 +203,609 @@ class AccountsDataUpdateCoordinator(DataUpdateCoordinator):
         self._client = client
 
         super().__init__(
-            hass, _LOGGER, name=self.name, update_interval=SCAN_INTERVAL_ACCOUNTS
+            hass,
+            _LOGGER,
+            name=self.name,
+            update_interval=SCAN_INTERVAL_ACCOUNTS,
+            update_method=self._async_update_accounts,
+            snapshot_key=f"{client.organization_id}.accounts",
         )
 
-    async def _async_update_data(self):
-        """Update accounts data and exchange rates"""
+    async def _async_update_accounts(self):
+        """Update accounts data"""
         try:
             accounts = await self._client.get_accounts()
-            exchange_rates = await NiceHashPublicClient().get_exchange_rates()
-            rates_dict = dict()
-            for rate in exchange_rates:
-                fromCurrency = rate.get("fromCurrency")
-                # Only care about the Bitcoin exchange rates
-                if fromCurrency == CURRENCY_BTC:
-                    toCurrency = rate.get("toCurrency")
-                    exchange_rate = float(rate.get("exchangeRate"))
-                    rates_dict[f"{fromCurrency}-{toCurrency}"] = exchange_rate
             return {
                 "accounts": accounts,
-                "exchange_rates": rates_dict,
             }
         except Exception as e:
             raise UpdateFailed(e)
 
 
-class MiningRigsDataUpdateCoordinator(DataUpdateCoordinator):
+class ExchangeRatesDataUpdateCoordinator(NiceHashDataUpdateCoordinator):
+    """Manages fetching and caching exchange rates from NiceHash API"""
+
+    def __init__(self, hass: HomeAssistant, client: NiceHashPublicClient):
+        """Initialize"""
+        self.name = f"{DOMAIN}_exchange_rates_coordinator"
+        self._client = client
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=self.name,
+            update_interval=SCAN_INTERVAL_EXCHANGE_RATES,
+            update_method=self._async_update_exchange_rates,
+            snapshot_key="exchange_rates",
+        )
+
+    async def _async_update_exchange_rates(self):
+        """Update exchange rates, keyed by currency pair (e.g. BTC-USD)"""
+        try:
+            exchange_rates = await self._client.get_exchange_rates()
+            rates_dict = dict()
+            for rate in exchange_rates:
+                from_currency = rate.get("fromCurrency")
+                to_currency = rate.get("toCurrency")
+                exchange_rate = float(rate.get("exchangeRate"))
+                rates_dict[f"{from_currency}-{to_currency}"] = exchange_rate
+            return rates_dict
+        except Exception as e:
+            raise UpdateFailed(e)
+
+    def get_rate(self, from_currency, to_currency=CURRENCY_BTC):
+        """Exchange rate between two currencies, None if unknown"""
+        if from_currency == to_currency:
+            return 1.0
+        rate = self.data.get(f"{from_currency}-{to_currency}")
+        if rate is None:
+            inverse_rate = self.data.get(f"{to_currency}-{from_currency}")
+            if inverse_rate:
+                rate = 1 / inverse_rate
+        return rate
+
+
+class MiningRigsDataUpdateCoordinator(NiceHashDataUpdateCoordinator):
     """Manages fetching mining rigs data from NiceHash API"""
 
-    def __init__(self, hass: HomeAssistant, client: NiceHashPrivateClient):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: NiceHashPrivateClient,
+        hybrid_refresh=False,
+        history=False,
+    ):
         """Initialize"""
         self.name = f"{DOMAIN}_mining_rigs_coordinator"
         self._client = client
+        self._hybrid_refresh = hybrid_refresh
+        self.history = DeviceHistory() if history else None
+        self._last_full_refresh = None
+        self.full_refreshes = 0
+        self.partial_refreshes = 0
+        self._rig_listeners = dict()
+        self._rig_fingerprints = dict()
+        self._changed_rig_ids = set()
+        self._history_listeners = dict()
+        self._history_device_ids = set()
+        self._fleet_changes = FleetChanges()
+        # Rig and device id -> (status, status time, polls seen in it)
+        self._statuses = dict()
+        self._remove_rig_dispatcher = None
+        self._dispatched_success = None
 
         super().__init__(
-            hass, _LOGGER, name=self.name, update_interval=SCAN_INTERVAL_RIGS
+            hass,
+            _LOGGER,
+            name=self.name,
+            update_interval=SCAN_INTERVAL_RIGS,
+            update_method=self._async_update_mining_rigs,
+            snapshot_key=f"{client.organization_id}.mining_rigs",
         )
 
-    async def _async_update_data(self):
+    async def _async_update_mining_rigs(self):
         """Update mining rigs data"""
         try:
-            data = await self._client.get_mining_rigs()
-            mining_rigs = data.get("miningRigs")
-            rigs_dict = dict()
-            for rig in mining_rigs:
-                rig_id = rig.get("rigId")
-                rigs_dict[f"{rig_id}"] = rig
-            data["miningRigs"] = rigs_dict
+            data = None
+            if self._hybrid_refresh and not self._is_full_refresh_due():
+                data = await self._async_fetch_changed_rigs()
+            if data is None:
+                data = await self._async_fetch_all_rigs()
+            rigs_dict = data.get("miningRigs")
+            data["statistics"] = FleetStatistics(rigs_dict.values())
+            self._diff_rigs(rigs_dict)
+            if self.history is not None:
+                self._add_history(rigs_dict, data.get("devices"))
+            self.poll_interval = self._next_update_interval(rigs_dict)
             return data
         except Exception as e:
             raise UpdateFailed(e)
 
+    def _is_full_refresh_due(self) -> bool:
+        if not self.data or self._last_full_refresh is None:
+            return True
+        elapsed = time.monotonic() - self._last_full_refresh
+        return elapsed >= SCAN_INTERVAL_RIGS_FULL.total_seconds()
+
+    async def _async_fetch_all_rigs(self):
+        """Download and parse every rig through rigs2"""
+        # Responses may be shared with concurrent callers, don't modify them
+        data = dict(await self._client.get_mining_rigs())
+        # Parse every rig once per poll and index rigs and devices by id
+        rigs_dict = dict()
+        devices_dict = dict()
+        _merge_rigs(data.get("miningRigs"), rigs_dict, devices_dict)
+        # Fetch the remaining pages concurrently, merging each as it arrives
+        pagination = data.get("pagination") or dict()
+        total_pages = pagination.get("totalPageCount") or 1
+        pages = [
+            asyncio.ensure_future(self._client.get_mining_rigs(page=page))
+            for page in range(1, total_pages)
+        ]
+        try:
+            for page_request in asyncio.as_completed(pages):
+                page_data = await page_request
+                _merge_rigs(page_data.get("miningRigs"), rigs_dict, devices_dict)
+        finally:
+            # Stop fetching the other pages if one of them failed
+            for page in pages:
+                page.cancel()
+        data["miningRigs"] = rigs_dict
+        data["devices"] = devices_dict
+        self._last_full_refresh = time.monotonic()
+        self.full_refreshes += 1
+        return data
+
+    async def _async_fetch_changed_rigs(self):
+        """
+        Fetch details of rigs whose status changed since the latest snapshot,
+        None when a full refresh is needed instead
+        """
+        try:
+            summaries = _summarize_groups(await self._client.get_mining_groups())
+        except Exception as e:
+            _LOGGER.debug(f"Unable to list mining groups, refreshing all rigs: {e}")
+            return None
+        if not summaries:
+            return None
+
+        current_rigs = self.data.get("miningRigs")
+        changed_rig_ids = [
+            rig_id
+            for rig_id, summary in summaries.items()
+            if _is_rig_changed(current_rigs.get(rig_id), *summary)
+        ]
+        if len(changed_rig_ids) > len(summaries) * HYBRID_MAX_CHANGED_RATIO:
+            return None
+
+        # Unchanged rigs are kept as parsed, rigs no longer listed are dropped
+        rigs_dict = {
+            rig_id: current_rigs[rig_id]
+            for rig_id in summaries
+            if rig_id in current_rigs
+        }
+        requests = [
+            asyncio.ensure_future(self._client.get_mining_rig(rig_id))
+            for rig_id in changed_rig_ids
+        ]
+        try:
+            for rig_request in asyncio.as_completed(requests):
+                rig = MiningRig(await rig_request)
+                rigs_dict[f"{rig.id}"] = rig
+        finally:
+            for rig_request in requests:
+                rig_request.cancel()
+
+        devices_dict = dict()
+        for rig in rigs_dict.values():
+            devices_dict.update(rig.devices)
+        data = dict(self.data)
+        data["miningRigs"] = rigs_dict
+        data["devices"] = devices_dict
+        self.partial_refreshes += 1
+        return data
+
+    def _snapshot_data(self, data):
+        """Parsed rigs, serialized back into the rigs2 response shape"""
+        rigs = data.get("miningRigs").values()
+        return {"miningRigs": [rig.as_dict() for rig in rigs]}
+
+    def _restore_data(self, snapshot):
+        """Parse the rigs of a snapshot"""
+        # Fingerprints are not restored, so the first live update dispatches
+        # every rig and clears the stale flag of all rig and device sensors
+        rigs_dict = dict()
+        devices_dict = dict()
+        _merge_rigs(snapshot.get("miningRigs"), rigs_dict, devices_dict)
+        return {
+            "miningRigs": rigs_dict,
+            "devices": devices_dict,
+            "statistics": FleetStatistics(rigs_dict.values()),
+        }
+
+    def _diff_rigs(self, rigs_dict):
+        """Track which rigs changed since the previous snapshot"""
+        previous_rigs = self.data.get("miningRigs") if self.data else dict()
+        fingerprints = dict()
+        changed_rig_ids = set()
+        for rig_id, rig in rigs_dict.items():
+            fingerprint = _rig_fingerprint(rig)
+            fingerprints[rig_id] = fingerprint
+            if self._rig_fingerprints.get(rig_id) != fingerprint:
+                changed_rig_ids.add(rig_id)
+        # Sensors of removed rigs are removed, not updated
+        removed_rig_ids = previous_rigs.keys() - fingerprints.keys()
+        self._rig_fingerprints = fingerprints
+        self._changed_rig_ids = changed_rig_ids
+        self._fleet_changes = _diff_fleet(
+            previous_rigs, rigs_dict, changed_rig_ids | removed_rig_ids
+        )
+
+    def _add_history(self, rigs_dict, devices_dict):
+        """Record the readings of changed rigs, unchanged ones are still held"""
+        changed_device_ids = [
+            device_id
+            for rig_id in self._changed_rig_ids
+            for device_id in rigs_dict[rig_id].devices
+        ]
+        self._history_device_ids = self.history.add(
+            time.time(), devices_dict, changed_device_ids
+        )
+
+    def _next_update_interval(self, rigs_dict) -> timedelta:
+        """
+        Adapt the poll interval to how rig and device statuses are changing,
+        readings such as speed or temperature change on every poll
+        """
+        previous_statuses = self._statuses
+        statuses = dict()
+        for rig in rigs_dict.values():
+            _track_status(
+                previous_statuses, statuses, rig.id, rig.status, rig.status_time
+            )
+            for device in rig.devices.values():
+                _track_status(previous_statuses, statuses, device.id, device.status)
+        self._statuses = statuses
+
+        status_changed = statuses.keys() != previous_statuses.keys()
+        for status, _, polls in statuses.values():
+            # Statuses stuck in a transition, e.g. ERROR, stop fast polling
+            if polls <= TRANSITIONING_MAX_POLLS and _is_transitioning(status):
+                return SCAN_INTERVAL_RIGS_TRANSITIONING
+            if polls == 1:
+                status_changed = True
+
+        if status_changed:
+            return SCAN_INTERVAL_RIGS
+
+        # Nothing changed since the last poll, double the interval up to a cap
+        return min(
+            max(self.poll_interval, SCAN_INTERVAL_RIGS) * 2, SCAN_INTERVAL_RIGS_MAX
+        )
+
+    @callback
+    def async_add_rig_listener(self, rig_id, update_callback):
+        """Listen for updates to a single mining rig"""
+        return self._async_add_dispatch_listener(
+            self._rig_listeners, rig_id, update_callback
+        )
+
+    @callback
+    def async_add_history_listener(self, device_id, update_callback):
+        """
+        Listen for changes to the history of a single device, its readings
+        changed or its windows rolled over
+        """
+        return self._async_add_dispatch_listener(
+            self._history_listeners, device_id, update_callback
+        )
+
+    @callback
+    def _async_add_dispatch_listener(self, listeners_by_id, key, update_callback):
+        if self._remove_rig_dispatcher is None:
+            # Entities write their state when added, so dispatching starts
+            # from the current update result
+            self._dispatched_success = self.last_update_success
+            self._changed_rig_ids = set()
+            self._history_device_ids = set()
+            self._remove_rig_dispatcher = self.async_add_listener(
+                self._async_dispatch_rig_updates
+            )
+        listeners = listeners_by_id.setdefault(key, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener():
+            listeners.remove(update_callback)
+            if not listeners:
+                listeners_by_id.pop(key, None)
+            if (
+                not self._rig_listeners
+                and not self._history_listeners
+                and self._remove_rig_dispatcher
+            ):
+                self._remove_rig_dispatcher()
+                self._remove_rig_dispatcher = None
+
+        return remove_listener
+
+    @callback
+    def async_add_fleet_listener(self, fleet_callback):
+        """Listen for rigs and devices joining or leaving the fleet"""
+        dispatched = None
+
+        @callback
+        def dispatch_fleet_changes():
+            nonlocal dispatched
+            changes = self._fleet_changes
+            # Failed updates notify listeners again with the same changes
+            if changes is not dispatched:
+                dispatched = changes
+                if changes:
+                    fleet_callback(changes)
+
+        return self.async_add_listener(dispatch_fleet_changes)
+
+    @callback
+    def _async_dispatch_rig_updates(self):
+        """
+        Notify only the listeners of rigs that changed in the last update,
+        and of devices whose history changed
+        """
+        if self.last_update_success != self._dispatched_success:
+            # Availability of every rig entity follows the update result
+            self._dispatched_success = self.last_update_success
+            rigs_dict = self.data.get("miningRigs")
+            devices_dict = self.data.get("devices")
+            rig_ids = [rig_id for rig_id in self._rig_listeners if rig_id in rigs_dict]
+            device_ids = [
+                device_id
+                for device_id in self._history_listeners
+                if device_id in devices_dict
+            ]
+        elif self.last_update_success:
+            rig_ids = self._changed_rig_ids
+            device_ids = self._history_device_ids
+        else:
+            rig_ids = []
+            device_ids = []
+        self._changed_rig_ids = set()
+        self._history_device_ids = set()
+
+        for rig_id in rig_ids:
+            for update_callback in list(self._rig_listeners.get(rig_id, [])):
+                update_callback()
+        for device_id in device_ids:
+            for update_callback in list(self._history_listeners.get(device_id, [])):
+                update_callback()
+
+    def get_diagnostics(self):
+        diagnostics = super().get_diagnostics()
+        diagnostics["hybrid_refresh"] = self._hybrid_refresh
+        diagnostics["full_refreshes"] = self.full_refreshes
+        diagnostics["partial_refreshes"] = self.partial_refreshes
+        return diagnostics
+
+    def get_rig(self, rig_id) -> MiningRig:
+        """Parsed mining rig from the latest snapshot"""
+        return self.data.get("miningRigs").get(rig_id)
+
+    def get_device(self, device_id) -> MiningRigDevice:
+        """Parsed mining rig device from the latest snapshot"""
+        return self.data.get("devices").get(device_id)
+
+    def get_statistics(self) -> FleetStatistics:
+        """Fleet-wide statistics of the latest snapshot"""
+        return self.data.get("statistics")
+
+    def get_device_history(self, device_id, metric) -> MetricHistory:
+        """Rolling history of a device reading, None when history is disabled"""
+        if self.history is None:
+            return None
+        return self.history.get(device_id, metric)
+
+
+def _is_transitioning(status) -> bool:
+    return status is not None and status.upper() in TRANSITIONING_STATUSES
+
 
-class MiningPayoutsDataUpdateCoordinator(DataUpdateCoordinator):
+def _track_status(previous_statuses, statuses, item_id, status, status_time=None):
+    """Count the polls a rig or device has been seen in its current status"""
+    previous = previous_statuses.get(item_id)
+    if previous is not None and previous[0] == status and previous[1] == status_time:
+        statuses[item_id] = (status, status_time, previous[2] + 1)
+    else:
+        statuses[item_id] = (status, status_time, 1)
+
+
+def _summarize_groups(data):
+    """Status and status time of every rig in a groups/list response"""
+    summaries = dict()
+    groups = list(((data or dict()).get("groups") or dict()).values())
+    while groups:
+        group = groups.pop()
+        for rig in group.get("rigs") or []:
+            status = rig.get("minerStatus") or rig.get("status")
+            summaries[f"{rig.get('rigId')}"] = (status, rig.get("statusTime"))
+        groups.extend((group.get("groups") or dict()).values())
+    return summaries
+
+
+def _is_rig_changed(rig: MiningRig, status, status_time) -> bool:
+    """Whether a listed rig differs from its parsed snapshot"""
+    if rig is None:
+        return True
+    if status_time is not None and status_time != rig.status_time:
+        return True
+    return status != rig.status
+
+
+def _diff_fleet(previous_rigs, rigs_dict, changed_rig_ids) -> FleetChanges:
+    """Rigs and devices added or removed, only changed rigs are compared"""
+    changes = FleetChanges()
+    for rig_id in changed_rig_ids:
+        previous_rig = previous_rigs.get(rig_id)
+        rig = rigs_dict.get(rig_id)
+        if previous_rig is None:
+            changes.added_rigs.append(rig)
+        elif rig is None:
+            changes.removed_rig_ids.append(rig_id)
+            changes.removed_device_ids.extend(previous_rig.devices.keys())
+        elif rig.devices.keys() != previous_rig.devices.keys():
+            for device_id in rig.devices.keys() - previous_rig.devices.keys():
+                changes.added_devices.append((rig, rig.devices[device_id]))
+            changes.removed_device_ids.extend(
+                previous_rig.devices.keys() - rig.devices.keys()
+            )
+    return changes
+
+
+def _merge_rigs(mining_rigs, rigs_dict, devices_dict):
+    """Parse a page of raw mining rigs into the rig and device indexes"""
+    for rig_data in mining_rigs or []:
+        rig = MiningRig(rig_data)
+        rigs_dict[f"{rig.id}"] = rig
+        devices_dict.update(rig.devices)
+
+
+def _rig_fingerprint(rig: MiningRig):
+    """Values of a mining rig that are displayed by rig and device sensors"""
+    devices = tuple(
+        (
+            device.id,
+            device.name,
+            device.status,
+            device.temperature,
+            device.load,
+            device.rpm,
+            device.algorithm,
+            device.speed,
+            device.speed_unit,
+        )
+        for device in rig.devices.values()
+    )
+    return (
+        rig.name,
+        rig.status,
+        rig.status_time,
+        rig.profitability,
+        rig.unpaid_amount,
+        devices,
+    )
+
+
+class MiningPayoutsDataUpdateCoordinator(NiceHashDataUpdateCoordinator):
     """Manages fetching mining rig payout data from NiceHash API"""
 
     def __init__(self, hass: HomeAssistant, client: NiceHashPrivateClient):
         """Initialize"""
         self.name = f"{DOMAIN}_mining_payouts_coordinator"
         self._client = client
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{client.organization_id}.payouts"
+        )
+        self._restored = False
+        self.payouts = PayoutStore()
+        self.earnings = EarningsEstimator()
 
         super().__init__(
-            hass, _LOGGER, name=self.name, update_interval=SCAN_INTERVAL_PAYOUTS
+            hass,
+            _LOGGER,
+            name=self.name,
+            update_interval=SCAN_INTERVAL_PAYOUTS,
+            update_method=self._async_update_payouts,
         )
 
-    async def _async_update_data(self):
+    async def async_restore_snapshot(self) -> bool:
+        """Payouts are already persisted, restore them from their own store"""
+        try:
+            await self._async_restore_payouts()
+        except Exception as e:
+            _LOGGER.warning(f"Unable to restore {self.name} payouts: {e}")
+            return False
+        if not self.payouts:
+            return False
+
+        self.earnings.expire(time.time() * 1000)
+        self.data = self.payouts
+        self.stale = True
+        return True
+
+    async def _async_restore_payouts(self):
+        if not self._restored:
+            stored_payouts = await self._store.async_load()
+            if stored_payouts:
+                self.earnings.add(self.payouts.add(stored_payouts))
+            self._restored = True
+
+    async def _async_update_payouts(self):
         """Update mining payouts data"""
         try:
-            data = await self._client.get_rig_payouts(42)  # 6 (per day) * 7 days
-            payouts = data.get("list")
-            payouts.sort(key=lambda payout: payout.get("created"))
-            return payouts
+            await self._async_restore_payouts()
+
+            new_payouts = await self._async_fetch_new_payouts()
+            added = self.payouts.add(new_payouts)
+            if added:
+                self.earnings.add(added)
+                await self._store.async_save(self.payouts.as_list())
+            self.earnings.expire(time.time() * 1000)
+
+            self.poll_interval = _next_payouts_interval(self.payouts.cursor)
+            return self.payouts
         except Exception as e:
             raise UpdateFailed(e)
+
+    async def _async_fetch_new_payouts(self):
+        """Page backwards from the newest payout until reaching stored ones"""
+        if self.payouts.cursor is None:
+            return await self._async_fetch_initial_payouts()
+
+        new_payouts = []
+        before_timestamp = None
+        while len(new_payouts) < self.payouts.max_payouts:
+            data = await self._client.get_rig_payouts(
+                PAYOUTS_SYNC_PAGE_SIZE, before_timestamp
+            )
+            payouts = data.get("list") or []
+            unseen = [payout for payout in payouts if self.payouts.is_new(payout)]
+            new_payouts.extend(unseen)
+            if len(unseen) < len(payouts) or len(payouts) < PAYOUTS_SYNC_PAGE_SIZE:
+                break
+            before_timestamp = min(payout.get("created") for payout in payouts)
+        return new_payouts
+
+    async def _async_fetch_initial_payouts(self):
+        """Page backwards until the longest earnings window is covered"""
+        oldest = (time.time() - max(dict(EARNINGS_WINDOWS).values())) * 1000
+        initial_payouts = []
+        before_timestamp = None
+        while len(initial_payouts) < self.payouts.max_payouts:
+            data = await self._client.get_rig_payouts(
+                PAYOUTS_INITIAL_SYNC_SIZE, before_timestamp
+            )
+            payouts = data.get("list") or []
+            initial_payouts.extend(payouts)
+            if len(payouts) < PAYOUTS_INITIAL_SYNC_SIZE:
+                break
+            before_timestamp = min(payout.get("created") for payout in payouts)
+            if before_timestamp < oldest:
+                break
+        return initial_payouts
+
+
+def _next_payouts_interval(last_created) -> timedelta:
+    """Schedule the next poll shortly after the next payout is expected"""
+    if last_created is None:
+        return SCAN_INTERVAL_PAYOUTS
+
+    last_payout = datetime.fromtimestamp(last_created / 1000.0)
+    next_payout = last_payout + PAYOUT_PERIOD + PAYOUT_GRACE_PERIOD
+    now = datetime.now()
+    interval = next_payout - now
+    # Overdue payouts are checked for at a shorter, fixed interval, until so
+    # many periods were missed that the account is probably idle
+    if interval < SCAN_INTERVAL_PAYOUTS_OVERDUE:
+        if now - last_payout > PAYOUT_PERIOD * PAYOUT_MAX_MISSED_PERIODS:
+            return SCAN_INTERVAL_PAYOUTS
+        return SCAN_INTERVAL_PAYOUTS_OVERDUE
+    return min(interval, PAYOUT_PERIOD)
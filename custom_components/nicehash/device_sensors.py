@@ -5,9 +5,12 @@ from datetime import datetime
 import logging
 
 from homeassistant.const import ATTR_ATTRIBUTION
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 
 from .const import (
+    DEVICE_HISTORY_LABELS,
+    DEVICE_HISTORY_UNITS,
     DEVICE_STATUS_UNKNOWN,
     DEVICE_LOAD,
     DEVICE_RPM,
@@ -56,7 +59,7 @@ class DeviceSensor(Entity):
     @property
     def available(self):
         """Whether sensor is available"""
-        return self.coordinator.last_update_success
+        return self.coordinator.data_available
 
     @property
     def icon(self):
@@ -71,20 +74,26 @@ class DeviceSensor(Entity):
     async def async_added_to_hass(self):
         """Connect to dispatcher listening for entity data notifications"""
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_rig_listener(
+                self._rig_id, self._async_handle_rig_update
+            )
         )
 
+    @callback
+    def _async_handle_rig_update(self):
+        """Write the state, unless the device left its rig and is being removed"""
+        if self.coordinator.get_device(self._device_id) is not None:
+            self.async_write_ha_state()
+
     async def async_update(self):
         """Update entity"""
         await self.coordinator.async_request_refresh()
 
     def _get_device(self):
-        try:
-            mining_rigs = self.coordinator.data.get("miningRigs")
-            rig = MiningRig(mining_rigs.get(self._rig_id))
-            return rig.devices.get(self._device_id)
-        except Exception as e:
-            _LOGGER.error(f"Unable to get mining device ({self._device_id})\n{e}")
+        device = self.coordinator.get_device(self._device_id)
+        if device is None:
+            _LOGGER.error(f"Unable to get mining device ({self._device_id})")
+        return device
 
 
 class DeviceStatusSensor(DeviceSensor):
@@ -125,6 +134,7 @@ class DeviceStatusSensor(DeviceSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "status": self._status,
             "rig": self._rig_name,
         }
@@ -153,11 +163,10 @@ class DeviceSpeedSensor(DeviceSensor):
     def state(self):
         """Sensor state"""
         device = self._get_device()
-        if device and len(device.speeds) > 0:
-            algorithm = device.speeds[0]
-            self._algorithm = algorithm.get("title")
-            self._speed = algorithm.get("speed")
-            self._speed_unit = algorithm.get("displaySuffix")
+        if device and device.algorithm is not None:
+            self._algorithm = device.algorithm
+            self._speed = device.speed
+            self._speed_unit = device.speed_unit
         else:
             self._algorithm = "Unknown"
             self._speed = 0.00
@@ -180,6 +189,7 @@ class DeviceSpeedSensor(DeviceSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "algorithm": self._algorithm,
             "speed": self._speed,
             "speed_unit": self._speed_unit,
@@ -210,11 +220,10 @@ class DeviceAlgorithmSensor(DeviceSensor):
     def state(self):
         """Sensor state"""
         device = self._get_device()
-        if device and len(device.speeds) > 0:
-            algorithm = device.speeds[0]
-            self._algorithm = algorithm.get("title")
-            self._speed = algorithm.get("speed")
-            self._speed_unit = algorithm.get("displaySuffix")
+        if device and device.algorithm is not None:
+            self._algorithm = device.algorithm
+            self._speed = device.speed
+            self._speed_unit = device.speed_unit
         else:
             self._algorithm = "Unknown"
             self._speed = 0.00
@@ -232,6 +241,7 @@ class DeviceAlgorithmSensor(DeviceSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "algorithm": self._algorithm,
             "speed": self._speed,
             "speed_unit": self._speed_unit,
@@ -283,6 +293,7 @@ class DeviceTemperatureSensor(DeviceSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "temperature": self._temperature,
             "rig": self._rig_name,
         }
@@ -331,6 +342,7 @@ class DeviceLoadSensor(DeviceSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "load": self._load,
             "rig": self._rig_name,
         }
@@ -377,7 +389,82 @@ class DeviceRPMSensor(DeviceSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "rpm": self._rpm,
             "rig": self._rig_name,
         }
 
+
+class DeviceHistorySensor(DeviceSensor):
+    """
+    Displays hourly average of a mining rig device reading, with rolling
+    minimum, maximum and moving average
+    """
+
+    def __init__(
+        self,
+        coordinator: MiningRigsDataUpdateCoordinator,
+        rig: MiningRig,
+        device: MiningRigDevice,
+        metric: str,
+    ):
+        """Initialize the sensor"""
+        super().__init__(coordinator, rig, device)
+        self._metric = metric
+
+    async def async_added_to_hass(self):
+        """Connect to dispatcher listening for device history changes"""
+        self.async_on_remove(
+            self.coordinator.async_add_history_listener(
+                self._device_id, self.async_write_ha_state
+            )
+        )
+
+    @property
+    def name(self):
+        """Sensor name"""
+        label = DEVICE_HISTORY_LABELS.get(self._metric)
+        return f"{self._device_name} {label} Average"
+
+    @property
+    def unique_id(self):
+        """Unique entity id"""
+        return f"{self._device_id}:{self._metric}:average"
+
+    @property
+    def state(self):
+        """Sensor state"""
+        history = self.coordinator.get_device_history(self._device_id, self._metric)
+        if history:
+            mean = history.get_mean("1h")
+            if mean is not None:
+                return round(mean, 2)
+        return None
+
+    @property
+    def icon(self):
+        """Sensor icon"""
+        if self._metric == "temperature":
+            return ICON_THERMOMETER
+        return ICON_SPEEDOMETER
+
+    @property
+    def unit_of_measurement(self):
+        """Sensor unit of measurement"""
+        if self._metric == "speed":
+            device = self._get_device()
+            if device and device.speed_unit:
+                return f"{device.speed_unit}/s"
+            return None
+        return DEVICE_HISTORY_UNITS.get(self._metric)
+
+    @property
+    def device_state_attributes(self):
+        """Sensor device state attributes"""
+        history = self.coordinator.get_device_history(self._device_id, self._metric)
+        return {
+            ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
+            **(history.as_dict() if history else dict()),
+            "rig": self._rig_name,
+        }
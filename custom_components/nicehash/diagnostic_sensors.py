@@ -0,0 +1,123 @@
+"""
+NiceHash Diagnostic Sensors
+"""
+import logging
+
+from homeassistant.const import ATTR_ATTRIBUTION
+from homeassistant.helpers.entity import Entity
+
+from .const import (
+    DEFAULT_NAME,
+    ICON_PULSE,
+    ICON_SPEEDOMETER,
+    NICEHASH_ATTRIBUTION,
+)
+from .coordinators import NiceHashDataUpdateCoordinator
+from .nicehash import RequestMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EndpointLatencySensor(Entity):
+    """
+    Displays median request latency of a NiceHash API endpoint
+    """
+
+    def __init__(
+        self,
+        metrics: RequestMetrics,
+        organization_id: str,
+        endpoint: str,
+        organization_name: str = DEFAULT_NAME,
+    ):
+        """Initialize the sensor"""
+        self.metrics = metrics
+        self.organization_id = organization_id
+        self.organization_name = organization_name
+        self.endpoint = endpoint
+
+    @property
+    def name(self):
+        """Sensor name"""
+        return f"{self.organization_name} {self.endpoint} Latency"
+
+    @property
+    def unique_id(self):
+        """Unique entity id"""
+        return f"{self.organization_id}:diagnostics:{self.endpoint}:latency"
+
+    @property
+    def state(self):
+        """Sensor state"""
+        return self.metrics.get_endpoint(self.endpoint).latency.as_dict(1000)["p50"]
+
+    @property
+    def icon(self):
+        """Sensor icon"""
+        return ICON_SPEEDOMETER
+
+    @property
+    def unit_of_measurement(self):
+        """Sensor unit of measurement"""
+        return "ms"
+
+    @property
+    def device_state_attributes(self):
+        """Sensor device state attributes"""
+        return {
+            ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            **self.metrics.get_endpoint(self.endpoint).as_dict(),
+        }
+
+
+class CoordinatorUpdateSensor(Entity):
+    """
+    Displays duration of a coordinator's last update
+    """
+
+    def __init__(
+        self,
+        coordinator: NiceHashDataUpdateCoordinator,
+        organization_id: str,
+        label: str,
+        organization_name: str = DEFAULT_NAME,
+    ):
+        """Initialize the sensor"""
+        self.coordinator = coordinator
+        self.organization_id = organization_id
+        self.organization_name = organization_name
+        self.label = label
+
+    @property
+    def name(self):
+        """Sensor name"""
+        return f"{self.organization_name} {self.label} Update Duration"
+
+    @property
+    def unique_id(self):
+        """Unique entity id"""
+        key = self.label.lower().replace(" ", "_")
+        return f"{self.organization_id}:diagnostics:{key}:update"
+
+    @property
+    def state(self):
+        """Sensor state"""
+        return self.coordinator.update_duration.as_dict(1000)["last"]
+
+    @property
+    def icon(self):
+        """Sensor icon"""
+        return ICON_PULSE
+
+    @property
+    def unit_of_measurement(self):
+        """Sensor unit of measurement"""
+        return "ms"
+
+    @property
+    def device_state_attributes(self):
+        """Sensor device state attributes"""
+        return {
+            ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            **self.coordinator.get_diagnostics(),
+        }
@@ -0,0 +1,92 @@
+"""
+Earnings estimated from the NiceHash mining payout stream
+"""
+from collections import deque
+
+from .const import EARNINGS_WINDOWS, PAYOUT_USER
+
+
+class EarningsWindow:
+    """
+    Running totals of the user payouts created in the last window seconds
+
+    Payouts arrive oldest first, so they are appended on the right and
+    expired from the left, each payout is added and removed exactly once.
+    """
+
+    __slots__ = ("window_ms", "_payouts", "amount", "fee")
+
+    def __init__(self, window_seconds: int):
+        self.window_ms = window_seconds * 1000
+        self._payouts = deque()
+        self.amount = 0.0
+        self.fee = 0.0
+
+    def __len__(self):
+        return len(self._payouts)
+
+    def add(self, payout):
+        self._payouts.append(payout)
+        self.amount += payout.amount
+        self.fee += payout.fee
+
+    def expire(self, now_ms):
+        oldest = now_ms - self.window_ms
+        while self._payouts and self._payouts[0].created < oldest:
+            payout = self._payouts.popleft()
+            self.amount -= payout.amount
+            self.fee -= payout.fee
+        if not self._payouts:
+            # Don't carry rounding errors over an empty window
+            self.amount = 0.0
+            self.fee = 0.0
+
+    @property
+    def net(self):
+        return self.amount - self.fee
+
+    @property
+    def fee_ratio(self):
+        if self.amount == 0:
+            return None
+        return self.fee / self.amount
+
+    @property
+    def average_interval_ms(self):
+        """Mean time between the payouts of the window"""
+        if len(self._payouts) < 2:
+            return None
+        elapsed = self._payouts[-1].created - self._payouts[0].created
+        return elapsed / (len(self._payouts) - 1)
+
+
+class EarningsEstimator:
+    """
+    Earnings over sliding windows, fed with payouts as they are stored
+    """
+
+    def __init__(self):
+        self.windows = {
+            name: EarningsWindow(seconds) for name, seconds in EARNINGS_WINDOWS
+        }
+        self._latest_created = None
+
+    def add(self, payouts):
+        """Add payouts newer than every payout added before, oldest first"""
+        for payout in payouts:
+            if payout.account_type != PAYOUT_USER:
+                continue
+            if self._latest_created is not None and (
+                payout.created < self._latest_created
+            ):
+                continue
+            self._latest_created = payout.created
+            for window in self.windows.values():
+                window.add(payout)
+
+    def expire(self, now_ms):
+        for window in self.windows.values():
+            window.expire(now_ms)
+
+    def get_window(self, name) -> EarningsWindow:
+        return self.windows.get(name)
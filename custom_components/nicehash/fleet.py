@@ -0,0 +1,64 @@
+"""
+Fleet-wide statistics for NiceHash mining rigs
+"""
+from array import array
+from collections import Counter
+
+
+class FleetStatistics:
+    """
+    Columnar store of per-device readings, built once per rigs poll
+
+    Per-rig values come from the aggregates precomputed by MiningRig.
+    """
+
+    def __init__(self, rigs):
+        self.temperatures = array("i")
+        self.loads = array("d")
+        self.speed_by_algorithm = dict()
+        self.unit_by_algorithm = dict()
+        self.devices_by_status = Counter()
+
+        for rig in rigs:
+            self.temperatures.extend(rig.temperatures)
+            self.loads.extend(device.load for device in rig.devices.values())
+            self.devices_by_status.update(rig.status_summary)
+            for algo in rig.algorithms.values():
+                self.speed_by_algorithm[algo.name] = (
+                    self.speed_by_algorithm.get(algo.name, 0.0) + algo.speed
+                )
+                self.unit_by_algorithm[algo.name] = algo.unit
+
+        self.num_devices = len(self.temperatures)
+
+        if self.num_devices > 0:
+            self.highest_temperature = max(self.temperatures)
+            self.lowest_temperature = min(self.temperatures)
+            self.mean_temperature = sum(self.temperatures) / self.num_devices
+            self.mean_load = sum(self.loads) / self.num_devices
+        else:
+            self.highest_temperature = 0
+            self.lowest_temperature = 0
+            self.mean_temperature = 0
+            self.mean_load = 0
+
+
+class FleetChanges:
+    """
+    Rigs and devices that joined or left the fleet since the previous poll
+    """
+
+    def __init__(self):
+        self.added_rigs = []
+        self.removed_rig_ids = []
+        # (MiningRig, MiningRigDevice) pairs of devices added to known rigs
+        self.added_devices = []
+        self.removed_device_ids = []
+
+    def __bool__(self):
+        return bool(
+            self.added_rigs
+            or self.removed_rig_ids
+            or self.added_devices
+            or self.removed_device_ids
+        )
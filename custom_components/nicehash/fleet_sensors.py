@@ -0,0 +1,208 @@
+"""
+NiceHash Fleet Sensors
+"""
+import logging
+
+from homeassistant.const import ATTR_ATTRIBUTION
+from homeassistant.helpers.entity import Entity
+
+from .const import (
+    DEFAULT_NAME,
+    DEVICE_STATUS_MINING,
+    ICON_MEMORY,
+    ICON_SPEEDOMETER,
+    ICON_THERMOMETER,
+    NICEHASH_ATTRIBUTION,
+)
+from .coordinators import MiningRigsDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FleetSensor(Entity):
+    """
+    Aggregate sensor over every device of every mining rig
+    """
+
+    def __init__(
+        self,
+        coordinator: MiningRigsDataUpdateCoordinator,
+        organization_id: str,
+        organization_name: str = DEFAULT_NAME,
+    ):
+        """Initialize the sensor"""
+        self.coordinator = coordinator
+        self.organization_id = organization_id
+        self.organization_name = organization_name
+
+    @property
+    def should_poll(self):
+        """No need to poll, Coordinator notifies entity of updates"""
+        return False
+
+    @property
+    def available(self):
+        """Whether sensor is available"""
+        return self.coordinator.data_available
+
+    async def async_added_to_hass(self):
+        """Connect to dispatcher listening for entity data notifications"""
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self.async_write_ha_state)
+        )
+
+    async def async_update(self):
+        """Update entity"""
+        await self.coordinator.async_request_refresh()
+
+
+class FleetTemperatureSensor(FleetSensor):
+    """
+    Displays highest temperature of all mining rig devices
+    """
+
+    @property
+    def name(self):
+        """Sensor name"""
+        return f"{self.organization_name} Fleet Temperature"
+
+    @property
+    def unique_id(self):
+        """Unique entity id"""
+        return f"{self.organization_id}:fleet:temperature"
+
+    @property
+    def state(self):
+        """Sensor state"""
+        return self.coordinator.get_statistics().highest_temperature
+
+    @property
+    def icon(self):
+        """Sensor icon"""
+        return ICON_THERMOMETER
+
+    @property
+    def unit_of_measurement(self):
+        """Sensor unit of measurement"""
+        # Not Celsius because then HA might convert to Fahrenheit
+        return "C"
+
+    @property
+    def device_state_attributes(self):
+        """Sensor device state attributes"""
+        statistics = self.coordinator.get_statistics()
+        return {
+            ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
+            "highest_temperature": statistics.highest_temperature,
+            "lowest_temperature": statistics.lowest_temperature,
+            "mean_temperature": round(statistics.mean_temperature, 1),
+            "mean_load": round(statistics.mean_load, 1),
+            "total_devices": statistics.num_devices,
+        }
+
+
+class FleetSpeedSensor(FleetSensor):
+    """
+    Displays total speed of the fleet's fastest algorithm
+    """
+
+    @property
+    def name(self):
+        """Sensor name"""
+        return f"{self.organization_name} Fleet Speed"
+
+    @property
+    def unique_id(self):
+        """Unique entity id"""
+        return f"{self.organization_id}:fleet:speed"
+
+    def _get_top_algorithm(self):
+        speed_by_algorithm = self.coordinator.get_statistics().speed_by_algorithm
+        if speed_by_algorithm:
+            return max(speed_by_algorithm, key=speed_by_algorithm.get)
+        return None
+
+    @property
+    def state(self):
+        """Sensor state"""
+        algorithm = self._get_top_algorithm()
+        if algorithm:
+            speed = self.coordinator.get_statistics().speed_by_algorithm[algorithm]
+            return round(speed, 2)
+        return 0
+
+    @property
+    def icon(self):
+        """Sensor icon"""
+        return ICON_SPEEDOMETER
+
+    @property
+    def unit_of_measurement(self):
+        """Sensor unit of measurement"""
+        algorithm = self._get_top_algorithm()
+        if algorithm:
+            return self.coordinator.get_statistics().unit_by_algorithm[algorithm]
+        return None
+
+    @property
+    def device_state_attributes(self):
+        """Sensor device state attributes"""
+        statistics = self.coordinator.get_statistics()
+        speeds = {
+            algorithm: f"{round(speed, 2)} {statistics.unit_by_algorithm[algorithm]}"
+            for algorithm, speed in statistics.speed_by_algorithm.items()
+        }
+        return {
+            ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
+            "algorithm": self._get_top_algorithm(),
+            "speeds": speeds,
+        }
+
+
+class FleetDeviceStatusSensor(FleetSensor):
+    """
+    Displays number of mining devices, with device counts by status
+    """
+
+    @property
+    def name(self):
+        """Sensor name"""
+        return f"{self.organization_name} Fleet Mining Devices"
+
+    @property
+    def unique_id(self):
+        """Unique entity id"""
+        return f"{self.organization_id}:fleet:mining_devices"
+
+    @property
+    def state(self):
+        """Sensor state"""
+        devices_by_status = self.coordinator.get_statistics().devices_by_status
+        return sum(
+            count
+            for status, count in devices_by_status.items()
+            if status.upper() == DEVICE_STATUS_MINING
+        )
+
+    @property
+    def icon(self):
+        """Sensor icon"""
+        return ICON_MEMORY
+
+    @property
+    def unit_of_measurement(self):
+        """Sensor unit of measurement"""
+        return "devices"
+
+    @property
+    def device_state_attributes(self):
+        """Sensor device state attributes"""
+        statistics = self.coordinator.get_statistics()
+        return {
+            ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
+            "devices_by_status": dict(statistics.devices_by_status),
+            "total_devices": statistics.num_devices,
+        }
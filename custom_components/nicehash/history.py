@@ -0,0 +1,301 @@
+"""
+Rolling-window history of NiceHash mining device readings
+"""
+from array import array
+from math import exp
+from zlib import crc32
+
+from .const import HISTORY_EWMA_TIME_CONSTANT, HISTORY_METRICS, HISTORY_WINDOWS
+
+# Shortest bucket of the history windows, every window rolls over with it
+HISTORY_BUCKET_SECONDS = min(
+    seconds / buckets for _, seconds, buckets in HISTORY_WINDOWS
+)
+
+
+class RollingWindow:
+    """
+    Time-weighted mean, min and max of the readings of the last window seconds
+
+    Readings are held for a time span, folded into a fixed ring of buckets by
+    how long they were held in each. Adding a reading updates the running
+    totals in O(1) per bucket, an expiring bucket is subtracted from them and
+    the window min and max are rescanned from the bucket minima and maxima,
+    so memory is bounded by the number of buckets. Buckets start at offset
+    seconds past a multiple of the bucket length.
+    """
+
+    __slots__ = (
+        "bucket_seconds",
+        "num_buckets",
+        "offset",
+        "_sums",
+        "_weights",
+        "_mins",
+        "_maxs",
+        "_bucket",
+        "_sum",
+        "_seconds",
+        "min",
+        "max",
+    )
+
+    def __init__(self, window_seconds: int, num_buckets: int, offset: float = 0.0):
+        self.bucket_seconds = window_seconds / num_buckets
+        self.num_buckets = num_buckets
+        self.offset = offset
+        self._sums = array("d", bytes(8 * num_buckets))
+        self._weights = array("d", bytes(8 * num_buckets))
+        self._mins = array("d", bytes(8 * num_buckets))
+        self._maxs = array("d", bytes(8 * num_buckets))
+        self._bucket = None
+        self._sum = 0.0
+        self._seconds = 0.0
+        self.min = None
+        self.max = None
+
+    def get_bucket(self, timestamp: float) -> int:
+        return int((timestamp - self.offset) // self.bucket_seconds)
+
+    def add(self, start: float, end: float, value: float):
+        """Add a reading held from start to end, in seconds"""
+        value = float(value)
+        self.expire(end)
+        # Only the part of the span still in the window is counted
+        first = max(self.get_bucket(start), self._bucket - self.num_buckets + 1)
+        for bucket in range(first, self.get_bucket(end) + 1):
+            bucket_start = bucket * self.bucket_seconds + self.offset
+            bucket_end = bucket_start + self.bucket_seconds
+            seconds = min(end, bucket_end) - max(start, bucket_start)
+            if seconds > 0:
+                self._add_to_bucket(bucket % self.num_buckets, value, seconds)
+
+    def _add_to_bucket(self, slot, value, seconds):
+        if self._weights[slot] == 0:
+            self._mins[slot] = value
+            self._maxs[slot] = value
+        else:
+            self._mins[slot] = min(self._mins[slot], value)
+            self._maxs[slot] = max(self._maxs[slot], value)
+        self._sums[slot] += value * seconds
+        self._weights[slot] += seconds
+        self._sum += value * seconds
+        self._seconds += seconds
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def expire(self, now: float):
+        """Expire buckets that fall out of the window ending at now"""
+        bucket = self.get_bucket(now)
+        if self._bucket is None:
+            self._bucket = bucket
+            return
+        if bucket <= self._bucket:
+            # A clock going back keeps the newest buckets
+            return
+
+        # A gap longer than the window expires every bucket once
+        first = max(self._bucket + 1, bucket - self.num_buckets + 1)
+        expired_seconds = 0.0
+        for expired in range(first, bucket + 1):
+            slot = expired % self.num_buckets
+            expired_seconds += self._weights[slot]
+            self._sum -= self._sums[slot]
+            self._seconds -= self._weights[slot]
+            self._sums[slot] = 0.0
+            self._weights[slot] = 0.0
+        self._bucket = bucket
+
+        if not any(self._weights):
+            # Don't carry rounding errors over an empty window
+            self._sum = 0.0
+            self._seconds = 0.0
+            self.min = None
+            self.max = None
+        elif expired_seconds:
+            live = [slot for slot in range(self.num_buckets) if self._weights[slot]]
+            self.min = min(self._mins[slot] for slot in live)
+            self.max = max(self._maxs[slot] for slot in live)
+
+    @property
+    def seconds(self):
+        """Time covered by the readings in the window"""
+        return self._seconds
+
+    @property
+    def mean(self):
+        if self._seconds <= 0:
+            return None
+        return self._sum / self._seconds
+
+
+class Ewma:
+    """
+    Exponentially weighted moving average, weighted by how long each reading
+    was held
+    """
+
+    __slots__ = ("time_constant", "value")
+
+    def __init__(self, time_constant: float):
+        self.time_constant = time_constant
+        self.value = None
+
+    def add(self, start: float, end: float, value: float):
+        """Add a reading held from start to end, in seconds"""
+        if self.value is None:
+            self.value = value
+        elif end > start:
+            alpha = 1 - exp(-(end - start) / self.time_constant)
+            self.value += alpha * (value - self.value)
+
+
+class MetricHistory:
+    """
+    Rolling windows and moving average of one device reading
+
+    A reading holds until a different one is added, so polls that don't
+    change it cost nothing and every reading counts for as long as it was
+    held, however often the rigs are polled.
+    """
+
+    __slots__ = ("windows", "ewma", "value", "_since")
+
+    def __init__(self, offset: float = 0.0):
+        self.windows = {
+            name: RollingWindow(seconds, buckets, offset)
+            for name, seconds, buckets in HISTORY_WINDOWS
+        }
+        self.ewma = Ewma(HISTORY_EWMA_TIME_CONSTANT)
+        self.value = None
+        self._since = None
+
+    def add(self, previous: float, timestamp: float, value: float):
+        """
+        Record a reading of the poll at timestamp. A changed reading replaced
+        the held one after the previous poll, a first reading counts from now
+        """
+        value = float(value)
+        if value == self.value:
+            return
+        if self.value is None or previous is None:
+            start = timestamp
+        else:
+            start = max(self._since, min(previous, timestamp))
+            self.update(start)
+        self._hold(start, timestamp, value)
+        self.value = value
+
+    def update(self, now: float):
+        """Count the held reading up to now and expire older readings"""
+        if self.value is not None and now > self._since:
+            self._hold(self._since, now, self.value)
+
+    def _hold(self, start, end, value):
+        for window in self.windows.values():
+            window.add(start, end, value)
+        self.ewma.add(start, end, value)
+        self._since = end
+
+    def get_mean(self, name):
+        """Window mean, the current reading until one was held for a while"""
+        mean = self.windows[name].mean
+        return self.value if mean is None else mean
+
+    def as_dict(self, digits=2):
+        summary = dict()
+        for name, window in self.windows.items():
+            # The current reading is in the window, even if just received
+            summary[f"mean_{name}"] = _round(self.get_mean(name), digits)
+            summary[f"min_{name}"] = _round(_min(window.min, self.value), digits)
+            summary[f"max_{name}"] = _round(_max(window.max, self.value), digits)
+        summary["ewma"] = _round(self.ewma.value, digits)
+        return summary
+
+
+def _round(value, digits):
+    return None if value is None else round(value, digits)
+
+
+def _min(a, b):
+    if a is None or b is None:
+        return b if a is None else a
+    return min(a, b)
+
+
+def _max(a, b):
+    if a is None or b is None:
+        return b if a is None else a
+    return max(a, b)
+
+
+class DeviceHistory:
+    """
+    History of every reading of every mining device, fed once per rigs poll
+
+    Every device rolls its window buckets over at its own offset, so the
+    summaries of a large fleet change a few devices at a time.
+    """
+
+    def __init__(self):
+        self.devices = dict()
+        self.timestamp = None
+        self._offsets = dict()
+
+    def add(self, timestamp: float, devices_dict, changed_device_ids=None) -> set:
+        """
+        Record the readings of a poll, forgetting devices that are gone. Only
+        devices in changed_device_ids, all devices by default, are read.
+        Returns the ids of the devices whose summaries changed
+        """
+        previous = self.timestamp
+        if previous is not None:
+            # A clock going back doesn't rewind the history
+            timestamp = max(timestamp, previous)
+        self.timestamp = timestamp
+
+        for device_id in self.devices.keys() - devices_dict.keys():
+            del self.devices[device_id]
+            del self._offsets[device_id]
+
+        if changed_device_ids is None:
+            changed_device_ids = devices_dict.keys()
+        changed = set()
+        for device_id in changed_device_ids:
+            device = devices_dict.get(device_id)
+            if device is None:
+                continue
+            metrics = self.devices.get(device_id)
+            if metrics is None:
+                offset = crc32(device_id.encode()) % HISTORY_BUCKET_SECONDS
+                metrics = {metric: MetricHistory(offset) for metric in HISTORY_METRICS}
+                self.devices[device_id] = metrics
+                self._offsets[device_id] = offset
+            for metric, history in metrics.items():
+                history.add(previous, timestamp, getattr(device, metric))
+            changed.add(device_id)
+
+        if previous is not None:
+            for device_id, offset in self._offsets.items():
+                if device_id not in changed and _is_rolled_over(
+                    offset, previous, timestamp
+                ):
+                    changed.add(device_id)
+        return changed
+
+    def get(self, device_id, metric) -> MetricHistory:
+        """History of a device reading, up to the latest poll"""
+        metrics = self.devices.get(device_id)
+        if metrics is None:
+            return None
+        history = metrics.get(metric)
+        if history is not None:
+            history.update(self.timestamp)
+        return history
+
+
+def _is_rolled_over(offset, previous, timestamp) -> bool:
+    """Whether a bucket starting at offset rolled over between two polls"""
+    return (previous - offset) // HISTORY_BUCKET_SECONDS != (
+        timestamp - offset
+    ) // HISTORY_BUCKET_SECONDS
@@ -5,7 +5,9 @@ References:
  - https://docs.nicehash.com/main/index.html
  - https://github.com/nicehash/rest-clients-demo/blob/master/python/nicehash.py
 """
-from datetime import datetime
+import asyncio
+from collections import deque
+from email.utils import parsedate_to_datetime
 from hashlib import sha256
 import hmac
 import httpx
@@ -13,13 +15,38 @@ import json
 import logging
 import re
 import sys
-from time import mktime
+import time
 import uuid
 
-from .const import MAX_TWO_BYTES, NICEHASH_API_URL
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .const import (
+    DEVICE_STATUS_MINING,
+    JSON_EXECUTOR_THRESHOLD,
+    METRICS_MAX_SAMPLES,
+    MAX_TWO_BYTES,
+    NICEHASH_API_URL,
+    PAYOUT_USER,
+    PAYOUTS_MAX_STORED,
+    RATE_LIMIT_BUDGETS,
+    RATE_LIMIT_DEFAULT_BUDGET,
+    RATE_LIMIT_DEFAULT_RETRY_AFTER,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_MAX_RETRY_AFTER,
+    RIGS_PAGE_SIZE,
+    TIME_SYNC_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Messages of the errors NiceHash answers requests with a bad X-Time with
+CLOCK_SKEW_ERROR_PATTERN = re.compile(
+    r"x-time|invalid time|time (skew|offset|difference)", re.IGNORECASE
+)
+
 
 def parse_device_name(raw_name):
     name = re.sub(
@@ -32,7 +59,337 @@ def parse_device_name(raw_name):
     return name
 
 
+async def send_request(
+    http_client, method, url, headers=None, data=None, metrics=None, endpoint=None
+):
+    """
+    Send a request over the shared HTTP client, or a one-off client if none
+    """
+    if http_client is None:
+        async with httpx.AsyncClient() as client:
+            return await send_request(
+                client, method, url, headers, data, metrics, endpoint
+            )
+
+    start = time.perf_counter()
+    try:
+        response = await http_client.request(method, url, headers=headers, data=data)
+    except Exception:
+        if metrics is not None:
+            metrics.record_request(endpoint, time.perf_counter() - start, 0, True)
+        raise
+
+    if metrics is not None:
+        metrics.record_request(
+            endpoint,
+            time.perf_counter() - start,
+            len(response.content),
+            response.status_code != 200,
+        )
+    return response
+
+
+def decode_json(content):
+    """Decode a JSON body with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+async def parse_response(response, metrics=None, endpoint=None):
+    if response.status_code == 200:
+        content = response.content
+        start = time.perf_counter()
+        if len(content) < JSON_EXECUTOR_THRESHOLD:
+            data = decode_json(content)
+        else:
+            # Keep decoding large bodies (e.g. big rigs2 pages) off the event loop
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(None, decode_json, content)
+        if metrics is not None:
+            metrics.record_decode(endpoint, time.perf_counter() - start)
+        return data
+
+    err_messages = [str(response.status_code), response.reason_phrase]
+    if response.content:
+        err_messages.append(str(response.content))
+    raise Exception(": ".join(err_messages))
+
+
+def is_clock_skew_error(response):
+    """Whether NiceHash rejected a request because of its X-Time header"""
+    if response.status_code not in (400, 401, 403):
+        return False
+    try:
+        data = decode_json(response.content)
+    except ValueError:
+        return False
+    if not isinstance(data, dict):
+        return False
+    for error in data.get("errors") or []:
+        if CLOCK_SKEW_ERROR_PATTERN.search(str(error.get("message") or "")):
+            return True
+    return False
+
+
+def get_endpoint_name(path):
+    """
+    Endpoint an API path is reported under, e.g. /main/api/v2/mining/rig2/1 -> rig2
+    """
+    parts = path.split("/")
+    if len(parts) > 2 and parts[-2] in ("rig2", "exchangeRate", "groups"):
+        return parts[-2]
+    return parts[-1]
+
+
+def get_endpoint_family(path):
+    """
+    Rate limit family of an API path, e.g. /main/api/v2/mining/rigs2 -> mining
+    """
+    parts = path.split("/")
+    if len(parts) > 4 and parts[1] == "main":
+        return parts[4]
+    return None
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)"""
+    if not value:
+        return RATE_LIMIT_DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return RATE_LIMIT_DEFAULT_RETRY_AFTER
+
+
+class MetricSamples:
+    """
+    Most recent samples of a measurement, for percentiles
+    """
+
+    def __init__(self, max_samples=METRICS_MAX_SAMPLES):
+        self._samples = deque(maxlen=max_samples)
+        self.last = None
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, value):
+        self._samples.append(value)
+        self.last = value
+
+    def percentile(self, percent):
+        """Nearest-rank percentile of the samples, None without samples"""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        index = max(0, -(-len(samples) * percent // 100) - 1)
+        return samples[int(index)]
+
+    def as_dict(self, scale=1):
+        """Last, p50 and p95 values, multiplied by scale (e.g. 1000 for ms)"""
+        values = {
+            "last": self.last,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
+        return {
+            key: round(value * scale, 3) if value is not None else None
+            for key, value in values.items()
+        }
+
+
+class EndpointMetrics:
+    """
+    Latency, payload size, decode time and error count of an API endpoint
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.latency = MetricSamples()
+        self.decode_time = MetricSamples()
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "bytes_received": self.bytes_received,
+            "latency_ms": self.latency.as_dict(1000),
+            "decode_time_ms": self.decode_time.as_dict(1000),
+        }
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request instrumentation shared between NiceHash clients
+    """
+
+    def __init__(self):
+        self.endpoints = dict()
+
+    def get_endpoint(self, endpoint) -> EndpointMetrics:
+        metrics = self.endpoints.get(endpoint)
+        if metrics is None:
+            metrics = EndpointMetrics()
+            self.endpoints[endpoint] = metrics
+        return metrics
+
+    def record_request(self, endpoint, latency, size, error):
+        metrics = self.get_endpoint(endpoint)
+        metrics.requests += 1
+        metrics.bytes_received += size
+        metrics.latency.add(latency)
+        if error:
+            metrics.errors += 1
+
+    def record_decode(self, endpoint, duration):
+        self.get_endpoint(endpoint).decode_time.add(duration)
+
+    def record_coalesced(self, endpoint):
+        self.get_endpoint(endpoint).coalesced += 1
+
+    def as_dict(self):
+        return {
+            endpoint: metrics.as_dict() for endpoint, metrics in self.endpoints.items()
+        }
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call, and its result, between concurrent callers
+    with the same key. Results are shared, callers must not modify them
+    """
+
+    def __init__(self):
+        self._calls = dict()
+        self.coalesced = 0
+
+    def __contains__(self, key):
+        return key in self._calls
+
+    async def run(self, key, call):
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+
+            def done(finished):
+                self._calls.pop(key, None)
+                # Mark the error retrieved, even if every caller was cancelled
+                if not finished.cancelled():
+                    finished.exception()
+
+            future.add_done_callback(done)
+        # A cancelled caller doesn't cancel the call for the others
+        return await asyncio.shield(future)
+
+
+class TokenBucket:
+    """
+    Request budget refilled at a constant rate, waiters are served in order
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> bool:
+        """Take a token, waiting for one if needed. Returns whether it waited"""
+        waited = False
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    waited = True
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                elapsed = now - self._updated
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                waited = True
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def block(self, seconds: float):
+        """Spend the whole budget and hold every request for a while"""
+        now = time.monotonic()
+        self._tokens = 0.0
+        self._updated = now
+        self._blocked_until = max(self._blocked_until, now + seconds)
+
+
+class RequestScheduler:
+    """
+    Queues requests within a token bucket budget per endpoint family and
+    backs off when NiceHash answers 429 Too Many Requests
+    """
+
+    def __init__(self, budgets=RATE_LIMIT_BUDGETS):
+        self._budgets = budgets
+        self._buckets = dict()
+        self.stats = {
+            "requests": 0,
+            "throttled": 0,
+            "rate_limited": 0,
+            "retries": 0,
+        }
+
+    def _get_bucket(self, family) -> TokenBucket:
+        bucket = self._buckets.get(family)
+        if bucket is None:
+            rate, capacity = self._budgets.get(family, RATE_LIMIT_DEFAULT_BUDGET)
+            bucket = TokenBucket(rate, capacity)
+            self._buckets[family] = bucket
+        return bucket
+
+    async def schedule(self, family, send):
+        """Run send(), a coroutine function returning a response, in budget"""
+        bucket = self._get_bucket(family)
+        attempt = 0
+        while True:
+            if await bucket.acquire():
+                self.stats["throttled"] += 1
+            self.stats["requests"] += 1
+
+            response = await send()
+            if response.status_code != 429:
+                return response
+
+            self.stats["rate_limited"] += 1
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            bucket.block(retry_after)
+            if attempt >= RATE_LIMIT_MAX_RETRIES or (
+                retry_after > RATE_LIMIT_MAX_RETRY_AFTER
+            ):
+                return response
+
+            attempt += 1
+            self.stats["retries"] += 1
+            _LOGGER.debug(f"Rate limited ({family}), retrying in {retry_after}s")
+
+
 class MiningAlgorithm:
+    __slots__ = ("name", "speed", "unit")
+
     def __init__(self, data: dict):
         self.name = data.get("title")
         self.speed = float(data.get("speed"))
@@ -41,17 +398,79 @@ class MiningAlgorithm:
 
 
 class MiningRigDevice:
+    __slots__ = (
+        "id",
+        "name",
+        "status",
+        "temperature",
+        "load",
+        "rpm",
+        "algorithm",
+        "speed",
+        "speed_unit",
+    )
+
     def __init__(self, data: dict):
         self.id = data.get("id")
-        self.name = parse_device_name(data.get("name"))
-        self.status = data.get("status").get("description")
+        # Names, statuses and algorithms repeat across a fleet, share them
+        self.name = sys.intern(parse_device_name(data.get("name")))
+        self.status = sys.intern(data.get("status").get("description"))
         self.temperature = int(data.get("temperature")) % MAX_TWO_BYTES
         self.load = float(data.get("load"))
         self.rpm = float(data.get("revolutionsPerMinute"))
-        self.speeds = data.get("speeds")
+        # Only the primary algorithm is displayed, don't keep the raw speeds
+        speeds = data.get("speeds")
+        if speeds:
+            primary = speeds[0]
+            self.algorithm = sys.intern(primary.get("title"))
+            self.speed = float(primary.get("speed"))
+            self.speed_unit = sys.intern(primary.get("displaySuffix"))
+        else:
+            self.algorithm = None
+            self.speed = 0.0
+            self.speed_unit = None
+
+    def as_dict(self):
+        """Device in the shape of the NiceHash API response"""
+        speeds = []
+        if self.algorithm is not None:
+            speeds.append(
+                {
+                    "title": self.algorithm,
+                    "speed": self.speed,
+                    "displaySuffix": self.speed_unit,
+                }
+            )
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": {"description": self.status},
+            "temperature": self.temperature,
+            "load": self.load,
+            "revolutionsPerMinute": self.rpm,
+            "speeds": speeds,
+        }
 
 
 class MiningRig:
+    __slots__ = (
+        "id",
+        "name",
+        "status",
+        "status_time",
+        "profitability",
+        "unpaid_amount",
+        "num_devices",
+        "devices",
+        "algorithms",
+        "fastest_algorithm",
+        "temperatures",
+        "high_temperature",
+        "low_temperature",
+        "active_devices",
+        "status_summary",
+    )
+
     def __init__(self, data: dict):
         self.id = data.get("rigId")
         self.name = data.get("name")
@@ -69,22 +488,67 @@ class MiningRig:
         else:
             self.num_devices = 0
             self.devices = dict()
-
-    def get_algorithms(self):
-        algorithms = dict()
+        self._aggregate_devices()
+
+    def _aggregate_devices(self):
+        """Compute derived values once, so sensors only read them"""
+        self.algorithms = dict()
+        self.temperatures = []
+        self.active_devices = 0
+        self.status_summary = dict()
         for device in self.devices.values():
-            if len(device.speeds) > 0:
-                algo = MiningAlgorithm(device.speeds[0])
-                existingAlgo = algorithms.get(algo.name)
+            self.temperatures.append(device.temperature)
+            self.status_summary[device.status] = (
+                self.status_summary.get(device.status, 0) + 1
+            )
+            if device.status.upper() == DEVICE_STATUS_MINING:
+                self.active_devices += 1
+            if device.algorithm is not None:
+                existingAlgo = self.algorithms.get(device.algorithm)
                 if existingAlgo:
-                    existingAlgo.speed += algo.speed
+                    existingAlgo.speed += device.speed
                 else:
-                    algorithms[algo.name] = algo
+                    self.algorithms[device.algorithm] = MiningAlgorithm(
+                        {
+                            "title": device.algorithm,
+                            "speed": device.speed,
+                            "displaySuffix": device.speed_unit,
+                        }
+                    )
+
+        self.fastest_algorithm = None
+        for algo in self.algorithms.values():
+            if self.fastest_algorithm is None or (
+                algo.speed > self.fastest_algorithm.speed
+            ):
+                self.fastest_algorithm = algo
+
+        if self.temperatures:
+            self.high_temperature = max(self.temperatures)
+            self.low_temperature = min(self.temperatures)
+        else:
+            self.high_temperature = 0
+            self.low_temperature = 0
 
-        return algorithms
+    def get_algorithms(self):
+        return self.algorithms
+
+    def as_dict(self):
+        """Mining rig in the shape of the NiceHash API response"""
+        return {
+            "rigId": self.id,
+            "name": self.name,
+            "minerStatus": self.status,
+            "statusTime": self.status_time,
+            "profitability": self.profitability,
+            "unpaidAmount": self.unpaid_amount,
+            "devices": [device.as_dict() for device in self.devices.values()],
+        }
 
 
 class Payout:
+    __slots__ = ("id", "currency", "created", "amount", "fee", "account_type")
+
     def __init__(self, data: dict):
         self.id = data.get("id")
         self.currency = "Unknown"
@@ -101,13 +565,95 @@ class Payout:
         if account_type:
             self.account_type = account_type.get("enumName")
 
+    def as_dict(self):
+        """Payout in the shape of the NiceHash API response"""
+        return {
+            "id": self.id,
+            "created": self.created,
+            "amount": self.amount,
+            "feeAmount": self.fee,
+            "currency": {"enumName": self.currency},
+            "accountType": {"enumName": self.account_type},
+        }
+
+
+class PayoutStore:
+    """
+    Bounded, time-ordered store of the most recent payouts
+    """
+
+    def __init__(self, max_payouts=PAYOUTS_MAX_STORED):
+        self.max_payouts = max_payouts
+        self._payouts = deque(maxlen=max_payouts)
+        self._ids = set()
+        self.latest_user_payout = None
+
+    def __len__(self):
+        return len(self._payouts)
+
+    def __iter__(self):
+        return iter(self._payouts)
+
+    @property
+    def cursor(self):
+        """Creation time of the newest stored payout, None when empty"""
+        if self._payouts:
+            return self._payouts[-1].created
+        return None
+
+    def is_new(self, raw_payout) -> bool:
+        """Whether a raw payout is newer than everything in the store"""
+        cursor = self.cursor
+        if cursor is None:
+            return True
+        return (
+            raw_payout.get("created") >= cursor
+            and raw_payout.get("id") not in self._ids
+        )
+
+    def add(self, raw_payouts):
+        """Add raw payouts newer than the cursor, returns the added payouts"""
+        added = []
+        for raw_payout in sorted(raw_payouts, key=lambda p: p.get("created")):
+            if not self.is_new(raw_payout):
+                continue
+            payout = Payout(raw_payout)
+            if len(self._payouts) == self.max_payouts:
+                self._ids.discard(self._payouts[0].id)
+            self._payouts.append(payout)
+            self._ids.add(payout.id)
+            if payout.account_type == PAYOUT_USER:
+                self.latest_user_payout = payout
+            added.append(payout)
+        return added
+
+    def as_list(self):
+        return [payout.as_dict() for payout in self._payouts]
+
 
 class NiceHashPublicClient:
+    def __init__(self, http_client=None, scheduler=None, metrics=None):
+        self.http_client = http_client
+        self.scheduler = scheduler or RequestScheduler()
+        self.metrics = metrics or RequestMetrics()
+        self.in_flight = SingleFlight()
+
     async def get_exchange_rates(self):
         exchange_data = await self.request("GET", "/main/api/v2/exchangeRate/list")
         return exchange_data.get("list")
 
     async def request(self, method, path, query=None, body=None):
+        if method != "GET":
+            return await self._request(method, path, query, body)
+        # Concurrent identical GETs share one request
+        key = (method, path, query)
+        if key in self.in_flight:
+            self.metrics.record_coalesced(get_endpoint_name(path))
+        return await self.in_flight.run(
+            key, lambda: self._request(method, path, query, body)
+        )
+
+    async def _request(self, method, path, query=None, body=None):
         url = NICEHASH_API_URL + path
 
         if query is not None:
@@ -115,87 +661,165 @@ class NiceHashPublicClient:
 
         _LOGGER.debug(url)
 
-        async with httpx.AsyncClient() as client:
-            if body:
-                data = json.dumps(body)
-                response = await client.request(method, url, data=data)
-            else:
-                response = await client.request(method, url)
+        data = None
+        if body:
+            data = json.dumps(body)
+
+        endpoint = get_endpoint_name(path)
 
-            if response.status_code == 200:
-                return response.json()
-            else:
-                err_messages = [str(response.status_code), response.reason]
-                if response.content:
-                    err_messages.append(str(response.content))
-                    raise Exception(": ".join(err_messages))
+        async def send():
+            return await send_request(
+                self.http_client,
+                method,
+                url,
+                data=data,
+                metrics=self.metrics,
+                endpoint=endpoint,
+            )
+
+        response = await self.scheduler.schedule(get_endpoint_family(path), send)
+        return await parse_response(response, self.metrics, endpoint)
 
 
 class NiceHashPrivateClient:
-    def __init__(self, organization_id, key, secret):
+    def __init__(
+        self,
+        organization_id,
+        key,
+        secret,
+        http_client=None,
+        scheduler=None,
+        metrics=None,
+    ):
         self.organization_id = organization_id
         self.key = key
         self.secret = secret
+        self.http_client = http_client
+        self.scheduler = scheduler or RequestScheduler()
+        self.metrics = metrics or RequestMetrics()
+        self.in_flight = SingleFlight()
+        # Signing state that doesn't change between requests
+        self._hmac = hmac.new(secret.encode(), digestmod=sha256)
+        self._message_organization = f"\00\00{organization_id}\00\00"
+        self._static_headers = {
+            "Content-Type": "application/json",
+            "X-Organization-Id": organization_id,
+        }
+        # Server time minus local time, in milliseconds
+        self.time_offset = 0
+        self._time_synced_at = None
 
     async def get_accounts(self):
         return await self.request("GET", "/main/api/v2/accounting/accounts2")
 
-    async def get_mining_rigs(self):
-        return await self.request("GET", "/main/api/v2/mining/rigs2")
+    async def get_mining_rigs(self, page=0, size=RIGS_PAGE_SIZE):
+        query = f"size={size}&page={page}"
+        return await self.request("GET", "/main/api/v2/mining/rigs2", query)
 
     async def get_mining_rig(self, rig_id):
         return await self.request("GET", f"/main/api/v2/mining/rig2/{rig_id}")
 
-    async def get_rig_payouts(self, size=84):
+    async def get_mining_groups(self):
+        query = "extendedResponse=false"
+        return await self.request("GET", "/main/api/v2/mining/groups/list", query)
+
+    async def get_rig_payouts(self, size=84, before_timestamp=None):
         query = f"size={size}"
+        if before_timestamp is not None:
+            query += f"&beforeTimestamp={before_timestamp}"
         return await self.request("GET", "/main/api/v2/mining/rigs/payouts", query)
 
-    async def request(self, method, path, query="", body=None):
-        xtime = self.get_epoch_ms_from_now()
-        xnonce = str(uuid.uuid4())
+    async def sync_time(self):
+        """Estimate the offset between the local clock and NiceHash's clock"""
+        path = "/api/v2/time"
+        url = NICEHASH_API_URL + path
+
+        endpoint = get_endpoint_name(path)
 
-        message = f"{self.key}\00{str(xtime)}\00{xnonce}\00\00{self.organization_id}\00\00{method}\00{path}\00{query}"
+        async def send():
+            return await send_request(
+                self.http_client, "GET", url, metrics=self.metrics, endpoint=endpoint
+            )
 
+        sent_at = time.time()
+        response = await self.scheduler.schedule(get_endpoint_family(path), send)
+        received_at = time.time()
+        data = await parse_response(response, self.metrics, endpoint)
+        server_time = data.get("serverTime")
+        # Assume the server read its clock halfway through the round trip
+        local_time = (sent_at + received_at) / 2 * 1000
+        self.time_offset = int(server_time - local_time)
+        self._time_synced_at = time.monotonic()
+        _LOGGER.debug(f"Clock offset to NiceHash is {self.time_offset}ms")
+
+    async def request(self, method, path, query="", body=None):
+        if method != "GET":
+            return await self._request(method, path, query, body)
+        # Concurrent identical GETs share one signed request
+        key = (method, path, query)
+        if key in self.in_flight:
+            self.metrics.record_coalesced(get_endpoint_name(path))
+        return await self.in_flight.run(
+            key, lambda: self._request(method, path, query, body)
+        )
+
+    async def _request(self, method, path, query="", body=None):
         data = None
         if body:
             data = json.dumps(body)
-            message += f"\00{data}"
 
-        digest = hmac.new(self.secret.encode(), message.encode(), sha256).hexdigest()
-        xauth = f"{self.key}:{digest}"
+        url = NICEHASH_API_URL + path
+        if query:
+            url += f"?{query}"
 
-        headers = {
-            "X-Time": str(xtime),
-            "X-Nonce": xnonce,
-            "X-Auth": xauth,
-            "Content-Type": "application/json",
-            "X-Organization-Id": self.organization_id,
-            "X-Request-Id": str(uuid.uuid4()),
-        }
+        _LOGGER.debug(url)
 
-        async with httpx.AsyncClient() as client:
-            client.headers = headers
+        if self._time_synced_at is None or (
+            time.monotonic() - self._time_synced_at > TIME_SYNC_INTERVAL
+        ):
+            try:
+                # Requests made while the clock is stale wait for one sync
+                await self.in_flight.run(("sync_time",), self.sync_time)
+            except Exception as e:
+                _LOGGER.debug(f"Unable to sync time with NiceHash\n{e}")
+
+        endpoint = get_endpoint_name(path)
+
+        async def send():
+            # Sign every attempt, retries need a fresh time and nonce
+            headers = self.get_headers(method, path, query, data)
+            return await send_request(
+                self.http_client, method, url, headers, data, self.metrics, endpoint
+            )
+
+        family = get_endpoint_family(path)
+        response = await self.scheduler.schedule(family, send)
+        if is_clock_skew_error(response):
+            # Retry right away with a corrected timestamp
+            _LOGGER.debug("Request rejected because of clock skew, resyncing time")
+            await self.sync_time()
+            response = await self.scheduler.schedule(family, send)
+        return await parse_response(response, self.metrics, endpoint)
+
+    def get_headers(self, method, path, query="", data=None):
+        xtime = self.get_epoch_ms_from_now()
+        xnonce = str(uuid.uuid4())
 
-            url = NICEHASH_API_URL + path
-            if query:
-                url += f"?{query}"
+        message = f"{self.key}\00{xtime}\00{xnonce}{self._message_organization}{method}\00{path}\00{query}"
 
-            _LOGGER.debug(url)
+        if data:
+            message += f"\00{data}"
 
-            if data:
-                response = await client.request(method, url, data=data)
-            else:
-                response = await client.request(method, url)
+        digest = self._hmac.copy()
+        digest.update(message.encode())
+        xauth = f"{self.key}:{digest.hexdigest()}"
 
-            if response.status_code == 200:
-                return response.json()
-            else:
-                err_messages = [str(response.status_code), response.reason]
-                if response.content:
-                    err_messages.append(str(response.content))
-                    raise Exception(": ".join(err_messages))
+        headers = self._static_headers.copy()
+        headers["X-Time"] = str(xtime)
+        headers["X-Nonce"] = xnonce
+        headers["X-Auth"] = xauth
+        headers["X-Request-Id"] = str(uuid.uuid4())
+        return headers
 
     def get_epoch_ms_from_now(self):
-        now = datetime.now()
-        now_ec_since_epoch = mktime(now.timetuple()) + now.microsecond / 1000000.0
-        return int(now_ec_since_epoch * 1000)
+        return int(time.time() * 1000) + self.time_offset
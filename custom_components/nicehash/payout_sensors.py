@@ -9,19 +9,20 @@ from homeassistant.helpers.entity import Entity
 
 from .const import (
     CURRENCY_BTC,
+    EARNINGS_WINDOWS,
     DEFAULT_NAME,
     FORMAT_DATETIME,
     ICON_CURRENCY_BTC,
+    ICON_PICKAXE,
     ICON_PULSE,
     ICON_THERMOMETER,
     NICEHASH_ATTRIBUTION,
-    PAYOUT_USER,
 )
 from .coordinators import (
     MiningPayoutsDataUpdateCoordinator,
     MiningRigsDataUpdateCoordinator,
 )
-from .nicehash import MiningRig, Payout
+from .nicehash import MiningRig
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,11 +33,15 @@ class RecentMiningPayoutSensor(Entity):
     """
 
     def __init__(
-        self, coordinator: MiningPayoutsDataUpdateCoordinator, organization_id: str
+        self,
+        coordinator: MiningPayoutsDataUpdateCoordinator,
+        organization_id: str,
+        organization_name: str = DEFAULT_NAME,
     ):
         """Initialize the sensor"""
         self.coordinator = coordinator
         self.organization_id = organization_id
+        self.organization_name = organization_name
         self._id = None
         self._created = None
         self._currency = None
@@ -46,7 +51,7 @@ class RecentMiningPayoutSensor(Entity):
     @property
     def name(self):
         """Sensor name"""
-        return f"{DEFAULT_NAME} Recent Mining Payout"
+        return f"{self.organization_name} Recent Mining Payout"
 
     @property
     def unique_id(self):
@@ -61,22 +66,19 @@ class RecentMiningPayoutSensor(Entity):
     @property
     def available(self):
         """Whether sensor is available"""
-        return self.coordinator.last_update_success
+        return self.coordinator.data_available
 
     @property
     def state(self):
         """Sensor state"""
-        try:
-            for raw_payout in self.coordinator.data:
-                payout = Payout(raw_payout)
-                if payout.account_type == PAYOUT_USER:
-                    self._id = payout.id
-                    self._amount = payout.amount
-                    self._currency = payout.currency
-                    self._created = datetime.fromtimestamp(payout.created / 1000.0)
-                    self._fee = payout.fee
-        except Exception as e:
-            _LOGGER.error(f"Unable to get most recent \n{e}")
+        payout = self.coordinator.data.latest_user_payout
+        if payout:
+            self._id = payout.id
+            self._amount = payout.amount
+            self._currency = payout.currency
+            self._created = datetime.fromtimestamp(payout.created / 1000.0)
+            self._fee = payout.fee
+        else:
             self._id = None
             self._created = None
             self._currency = None
@@ -103,6 +105,7 @@ class RecentMiningPayoutSensor(Entity):
             created = self._created.strftime(FORMAT_DATETIME)
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "amount": self._amount,
             "created": created,
             "fee": self._fee,
@@ -117,3 +120,89 @@ class RecentMiningPayoutSensor(Entity):
     async def async_update(self):
         """Update entity"""
         await self.coordinator.async_request_refresh()
+
+
+class MiningEarningsSensor(Entity):
+    """
+    Displays net mining earnings of a sliding window of payouts
+    """
+
+    def __init__(
+        self,
+        coordinator: MiningPayoutsDataUpdateCoordinator,
+        organization_id: str,
+        window: str,
+        organization_name: str = DEFAULT_NAME,
+    ):
+        """Initialize the sensor"""
+        self.coordinator = coordinator
+        self.organization_id = organization_id
+        self.organization_name = organization_name
+        self.window = window
+        self._days = dict(EARNINGS_WINDOWS)[window] / (24 * 60 * 60)
+
+    @property
+    def name(self):
+        """Sensor name"""
+        return f"{self.organization_name} Mining Earnings {self.window}"
+
+    @property
+    def unique_id(self):
+        """Unique entity id"""
+        return f"{self.organization_id}:earnings:{self.window}"
+
+    @property
+    def should_poll(self):
+        """No need to poll, Coordinator notifies entity of updates"""
+        return False
+
+    @property
+    def available(self):
+        """Whether sensor is available"""
+        return self.coordinator.data_available
+
+    @property
+    def state(self):
+        """Sensor state"""
+        return round(self.coordinator.earnings.get_window(self.window).net, 8)
+
+    @property
+    def icon(self):
+        """Sensor icon"""
+        return ICON_PICKAXE
+
+    @property
+    def unit_of_measurement(self):
+        """Sensor unit of measurement"""
+        return CURRENCY_BTC
+
+    @property
+    def device_state_attributes(self):
+        """Sensor device state attributes"""
+        window = self.coordinator.earnings.get_window(self.window)
+        fee_ratio = window.fee_ratio
+        average_interval = window.average_interval_ms
+        return {
+            ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
+            "amount": round(window.amount, 8),
+            "fee": round(window.fee, 8),
+            "fee_ratio": round(fee_ratio, 4) if fee_ratio is not None else None,
+            "payouts": len(window),
+            "daily_average": round(window.net / self._days, 8),
+            "average_payout_interval_hours": (
+                round(average_interval / 3600000, 2)
+                if average_interval is not None
+                else None
+            ),
+        }
+
+    async def async_added_to_hass(self):
+        """Connect to dispatcher listening for entity data notifications"""
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self.async_write_ha_state)
+        )
+
+    async def async_update(self):
+        """Update entity"""
+        await self.coordinator.async_request_refresh()
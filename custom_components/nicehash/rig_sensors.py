@@ -54,12 +54,14 @@ class RigSensor(Entity):
     @property
     def available(self):
         """Whether sensor is available"""
-        return self.coordinator.last_update_success
+        return self.coordinator.data_available
 
     async def async_added_to_hass(self):
         """Connect to dispatcher listening for entity data notifications"""
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_rig_listener(
+                self._rig_id, self.async_write_ha_state
+            )
         )
 
     async def async_update(self):
@@ -67,11 +69,10 @@ class RigSensor(Entity):
         await self.coordinator.async_request_refresh()
 
     def _get_rig(self):
-        try:
-            mining_rigs = self.coordinator.data.get("miningRigs")
-            return MiningRig(mining_rigs.get(self._rig_id))
-        except Exception as e:
-            _LOGGER.error(f"Unable to get mining rig ({self._rig_id})\n{e}")
+        rig = self.coordinator.get_rig(self._rig_id)
+        if rig is None:
+            _LOGGER.error(f"Unable to get mining rig ({self._rig_id})")
+        return rig
 
 
 class RigHighTemperatureSensor(RigSensor):
@@ -100,12 +101,8 @@ class RigHighTemperatureSensor(RigSensor):
         rig = self._get_rig()
         if rig:
             self._num_devices = rig.num_devices
-            self._temps = []
-            for device in rig.devices.values():
-                if device.temperature > -1:
-                    self._temps.append(device.temperature)
-            if len(self._temps) > 0:
-                self._highest_temp = max(self._temps)
+            self._temps = rig.temperatures
+            self._highest_temp = rig.high_temperature
 
         return self._highest_temp
 
@@ -125,6 +122,7 @@ class RigHighTemperatureSensor(RigSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "highest_temperature": self._highest_temp,
             "temperatures": self._temps,
             "total_devices": self._num_devices,
@@ -157,12 +155,8 @@ class RigLowTemperatureSensor(RigSensor):
         rig = self._get_rig()
         if rig:
             self._num_devices = rig.num_devices
-            self._temps = []
-            for device in rig.devices.values():
-                if device.temperature > -1:
-                    self._temps.append(device.temperature)
-            if len(self._temps) > 0:
-                self._lowest_temp = min(self._temps)
+            self._temps = rig.temperatures
+            self._lowest_temp = rig.low_temperature
 
         return self._lowest_temp
 
@@ -182,6 +176,7 @@ class RigLowTemperatureSensor(RigSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "lowest_temperature": self._lowest_temp,
             "temperatures": self._temps,
             "total_devices": self._num_devices,
@@ -195,6 +190,8 @@ class RigStatusSensor(RigSensor):
 
     _status = DEVICE_STATUS_UNKNOWN
     _status_time = None
+    _active_devices = 0
+    _status_summary = {}
 
     @property
     def name(self):
@@ -213,10 +210,13 @@ class RigStatusSensor(RigSensor):
         if rig:
             status = rig.status
             self._status_time = datetime.fromtimestamp(rig.status_time / 1000.0)
+            self._active_devices = rig.active_devices
+            self._status_summary = rig.status_summary
         else:
             status = DEVICE_STATUS_UNKNOWN
             self._status_time = None
-            status = DEVICE_STATUS_UNKNOWN
+            self._active_devices = 0
+            self._status_summary = {}
 
         self._status = status[0].upper() + status.lower()[1:]
         return self._status
@@ -240,8 +240,11 @@ class RigStatusSensor(RigSensor):
 
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "status": self._status,
             "status_time": status_time,
+            "active_devices": self._active_devices,
+            "devices": self._status_summary,
         }
 
 
@@ -291,6 +294,7 @@ class RigProfitabilitySensor(RigSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "profitability": self._profitability,
             "unpaid_amount": self._unpaid_amount,
         }
@@ -318,8 +322,7 @@ class RigAlgorithmSensor(RigSensor):
         """Sensor state"""
         rig = self._get_rig()
         if rig:
-            algorithms = rig.get_algorithms()
-            self._algorithms = [*algorithms.keys()]
+            self._algorithms = [*rig.algorithms.keys()]
             if len(self._algorithms) > 0:
                 return ", ".join(self._algorithms)
             return "Unknown"
@@ -332,7 +335,11 @@ class RigAlgorithmSensor(RigSensor):
     @property
     def device_state_attributes(self):
         """Sensor device state attributes"""
-        return {ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION, "algorithms": self._algorithms}
+        return {
+            ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
+            "algorithms": self._algorithms,
+        }
 
 
 class RigSpeedSensor(RigSensor):
@@ -359,14 +366,10 @@ class RigSpeedSensor(RigSensor):
         """Sensor state"""
         self._speed = 0
         rig = self._get_rig()
-        if rig:
-            algorithms = rig.get_algorithms()
-            for key in algorithms.keys():
-                algo = algorithms.get(key)
-                if algo.speed > self._speed:
-                    self._algorithm = algo.name
-                    self._speed = algo.speed
-                    self._unit = algo.unit
+        if rig and rig.fastest_algorithm:
+            self._algorithm = rig.fastest_algorithm.name
+            self._speed = rig.fastest_algorithm.speed
+            self._unit = rig.fastest_algorithm.unit
 
         return self._speed
 
@@ -385,8 +388,8 @@ class RigSpeedSensor(RigSensor):
         """Sensor device state attributes"""
         return {
             ATTR_ATTRIBUTION: NICEHASH_ATTRIBUTION,
+            "stale": self.coordinator.stale,
             "algorithm": self._algorithm,
             "speed": self._speed,
             "unit": self._unit,
         }
-
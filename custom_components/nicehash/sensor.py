@@ -5,7 +5,7 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ATTRIBUTION
-from homeassistant.core import Config, HomeAssistant
+from homeassistant.core import Config, HomeAssistant, callback
 from homeassistant.helpers.entity import Entity
 
 from .const import (
@@ -15,20 +15,25 @@ from .const import (
     CURRENCY_BTC,
     CURRENCY_EUR,
     CURRENCY_USD,
+    DEFAULT_NAME,
     DOMAIN,
+    EARNINGS_WINDOWS,
     DEVICE_LOAD,
     DEVICE_RPM,
     DEVICE_SPEED_RATE,
     DEVICE_SPEED_ALGORITHM,
-)
-from .nicehash import (
-    MiningRig,
-    MiningRigDevice,
-    NiceHashPrivateClient,
-    NiceHashPublicClient,
+    DIAGNOSTICS_ENDPOINTS,
+    DIAGNOSTICS_PUBLIC_ENDPOINTS,
+    HISTORY_METRICS,
 )
 from .account_sensors import BalanceSensor
-from .payout_sensors import RecentMiningPayoutSensor
+from .diagnostic_sensors import CoordinatorUpdateSensor, EndpointLatencySensor
+from .fleet_sensors import (
+    FleetDeviceStatusSensor,
+    FleetSpeedSensor,
+    FleetTemperatureSensor,
+)
+from .payout_sensors import MiningEarningsSensor, RecentMiningPayoutSensor
 from .rig_sensors import (
     RigAlgorithmSensor,
     RigHighTemperatureSensor,
@@ -39,6 +44,7 @@ from .rig_sensors import (
 )
 from .device_sensors import (
     DeviceAlgorithmSensor,
+    DeviceHistorySensor,
     DeviceSpeedSensor,
     DeviceStatusSensor,
     DeviceLoadSensor,
@@ -55,51 +61,162 @@ async def async_setup_platform(
     """Setup NiceHash sensor platform"""
     _LOGGER.debug("Creating new NiceHash sensor components")
 
-    data = hass.data[DOMAIN]
+    if discovery_info is None:
+        return
+
+    shared_data = hass.data[DOMAIN]
+    data = shared_data["organizations"][discovery_info.get("organization_id")]
     # Configuration
     organization_id = data.get("organization_id")
-    client = data.get("client")
+    organization_name = data.get("name")
     # Options
     currency = data.get("currency")
     balances_enabled = data.get("balances_enabled")
     payouts_enabled = data.get("payouts_enabled")
     rigs_enabled = data.get("rigs_enabled")
     devices_enabled = data.get("devices_enabled")
+    diagnostics_enabled = data.get("diagnostics_enabled")
+    history_enabled = data.get("history_enabled")
+
+    # Coordinators were refreshed or restored during setup, so entities are
+    # added without an update, which would refresh them again
 
     # Account balance sensors
     if balances_enabled:
         accounts_coordinator = data.get("accounts_coordinator")
+        exchange_rates_coordinator = shared_data.get("exchange_rates_coordinator")
         balance_sensors = create_balance_sensors(
-            organization_id, currency, accounts_coordinator
+            organization_id,
+            currency,
+            accounts_coordinator,
+            exchange_rates_coordinator,
+            organization_name,
         )
-        async_add_entities(balance_sensors, True)
+        async_add_entities(balance_sensors)
 
     # Payout sensors
     if payouts_enabled:
         _LOGGER.debug("Payout sensors enabled")
         payouts_coordinator = data.get("payouts_coordinator")
-        payout_sensors = create_payout_sensors(organization_id, payouts_coordinator)
+        payout_sensors = create_payout_sensors(
+            organization_id, payouts_coordinator, organization_name
+        )
         async_add_entities(payout_sensors)
 
     # Mining rig and device sensors
     if rigs_enabled or devices_enabled:
         rigs_coordinator = data.get("rigs_coordinator")
-        rig_data = await client.get_mining_rigs()
-        mining_rigs = rig_data.get("miningRigs")
+        # Rigs were already fetched and parsed by the coordinator during setup
+        mining_rigs = rigs_coordinator.data.get("miningRigs").values()
         _LOGGER.debug(f"Found {len(mining_rigs)} rigs")
 
         if rigs_enabled:
             _LOGGER.debug("Rig sensors enabled")
-            rig_sensors = create_rig_sensors(mining_rigs, rigs_coordinator)
-            async_add_entities(rig_sensors, True)
+            fleet_sensors = create_fleet_sensors(
+                organization_id, rigs_coordinator, organization_name
+            )
+            async_add_entities(fleet_sensors)
+
+        # Rigs and devices joining or leaving the fleet later get their
+        # sensors added or removed without a restart
+        fleet_entities = FleetEntities(
+            rigs_coordinator,
+            async_add_entities,
+            rigs_enabled=rigs_enabled,
+            devices_enabled=devices_enabled,
+            history_enabled=history_enabled,
+        )
+        fleet_entities.add_rigs(mining_rigs)
+        rigs_coordinator.async_add_fleet_listener(fleet_entities.async_update_fleet)
+
+    # Request and coordinator timing sensors
+    if diagnostics_enabled:
+        _LOGGER.debug("Diagnostic sensors enabled")
+        diagnostic_sensors = create_diagnostic_sensors(organization_id, data)
+        if data.get("shared_diagnostics_enabled"):
+            diagnostic_sensors.extend(
+                create_shared_diagnostic_sensors(organization_id, shared_data)
+            )
+        async_add_entities(diagnostic_sensors, True)
+
 
-        if devices_enabled:
-            _LOGGER.debug("Device sensors enabled")
-            device_sensors = create_device_sensors(mining_rigs, rigs_coordinator)
-            async_add_entities(device_sensors, True)
+class FleetEntities:
+    """
+    Rig and device sensors, indexed by rig and device id
+    """
 
+    def __init__(
+        self,
+        coordinator,
+        async_add_entities,
+        rigs_enabled=False,
+        devices_enabled=False,
+        history_enabled=False,
+    ):
+        self.coordinator = coordinator
+        self.async_add_entities = async_add_entities
+        self.rigs_enabled = rigs_enabled
+        self.devices_enabled = devices_enabled
+        self.history_enabled = history_enabled
+        self.rig_entities = dict()
+        self.device_entities = dict()
 
-def create_balance_sensors(organization_id, currency, coordinator):
+    def add_rigs(self, mining_rigs):
+        """Create sensors of rigs, and their devices, that have none yet"""
+        entities = []
+        for rig in mining_rigs:
+            if self.rigs_enabled and rig.id not in self.rig_entities:
+                rig_sensors = create_rig_sensors([rig], self.coordinator)
+                self.rig_entities[rig.id] = rig_sensors
+                entities.extend(rig_sensors)
+            for device in rig.devices.values():
+                entities.extend(self._create_device_entities(rig, device))
+        if entities:
+            self.async_add_entities(entities)
+
+    def _create_device_entities(self, rig, device):
+        if not self.devices_enabled or device.id in self.device_entities:
+            return []
+        device_sensors = create_single_device_sensors(rig, device, self.coordinator)
+        if self.history_enabled:
+            device_sensors.extend(
+                create_single_device_history_sensors(rig, device, self.coordinator)
+            )
+        self.device_entities[device.id] = device_sensors
+        return device_sensors
+
+    @callback
+    def async_update_fleet(self, changes):
+        """Add and remove sensors of rigs and devices that joined or left"""
+        self.add_rigs(changes.added_rigs)
+
+        entities = []
+        for rig, device in changes.added_devices:
+            entities.extend(self._create_device_entities(rig, device))
+        if entities:
+            self.async_add_entities(entities)
+
+        for rig_id in changes.removed_rig_ids:
+            _LOGGER.debug(f"Mining rig ({rig_id}) was removed, removing its sensors")
+            self._remove_entities(self.rig_entities.pop(rig_id, []))
+        for device_id in changes.removed_device_ids:
+            _LOGGER.debug(f"Device ({device_id}) was removed, removing its sensors")
+            self._remove_entities(self.device_entities.pop(device_id, []))
+
+    def _remove_entities(self, entities):
+        # Registry entries are kept, so returning hardware keeps its entity ids
+        for entity in entities:
+            if entity.hass is not None:
+                entity.hass.async_create_task(entity.async_remove())
+
+
+def create_balance_sensors(
+    organization_id,
+    currency,
+    coordinator,
+    exchange_rates_coordinator,
+    organization_name=DEFAULT_NAME,
+):
     _LOGGER.debug(f"Creating BTC account balance sensors")
     balance_sensors = [
         BalanceSensor(
@@ -107,18 +224,21 @@ def create_balance_sensors(organization_id, currency, coordinator):
             organization_id,
             currency=CURRENCY_BTC,
             balance_type=BALANCE_TYPE_AVAILABLE,
+            organization_name=organization_name,
         ),
         BalanceSensor(
             coordinator,
             organization_id,
             currency=CURRENCY_BTC,
             balance_type=BALANCE_TYPE_PENDING,
+            organization_name=organization_name,
         ),
         BalanceSensor(
             coordinator,
             organization_id,
             currency=CURRENCY_BTC,
             balance_type=BALANCE_TYPE_TOTAL,
+            organization_name=organization_name,
         ),
     ]
     if currency == CURRENCY_USD or currency == CURRENCY_EUR:
@@ -129,6 +249,8 @@ def create_balance_sensors(organization_id, currency, coordinator):
                 organization_id,
                 currency=currency,
                 balance_type=BALANCE_TYPE_AVAILABLE,
+                exchange_rates_coordinator=exchange_rates_coordinator,
+                organization_name=organization_name,
             )
         )
         balance_sensors.append(
@@ -137,6 +259,8 @@ def create_balance_sensors(organization_id, currency, coordinator):
                 organization_id,
                 currency=currency,
                 balance_type=BALANCE_TYPE_PENDING,
+                exchange_rates_coordinator=exchange_rates_coordinator,
+                organization_name=organization_name,
             )
         )
         balance_sensors.append(
@@ -145,6 +269,8 @@ def create_balance_sensors(organization_id, currency, coordinator):
                 organization_id,
                 currency=currency,
                 balance_type=BALANCE_TYPE_TOTAL,
+                exchange_rates_coordinator=exchange_rates_coordinator,
+                organization_name=organization_name,
             )
         )
     else:
@@ -153,18 +279,25 @@ def create_balance_sensors(organization_id, currency, coordinator):
     return balance_sensors
 
 
-def create_payout_sensors(organization_id, coordinator):
+def create_payout_sensors(organization_id, coordinator, organization_name=DEFAULT_NAME):
     _LOGGER.debug(f"Creating payout sensors")
     payout_sensors = []
-    payout_sensors.append(RecentMiningPayoutSensor(coordinator, organization_id))
+    payout_sensors.append(
+        RecentMiningPayoutSensor(coordinator, organization_id, organization_name)
+    )
+    for window, _ in EARNINGS_WINDOWS:
+        payout_sensors.append(
+            MiningEarningsSensor(
+                coordinator, organization_id, window, organization_name
+            )
+        )
 
     return payout_sensors
 
 
 def create_rig_sensors(mining_rigs, coordinator):
     rig_sensors = []
-    for rig_data in mining_rigs:
-        rig = MiningRig(rig_data)
+    for rig in mining_rigs:
         _LOGGER.debug(f"Creating {rig.name} ({rig.id}) sensors")
         rig_sensors.append(RigAlgorithmSensor(coordinator, rig))
         rig_sensors.append(RigHighTemperatureSensor(coordinator, rig))
@@ -176,21 +309,88 @@ def create_rig_sensors(mining_rigs, coordinator):
     return rig_sensors
 
 
+def create_fleet_sensors(organization_id, coordinator, organization_name=DEFAULT_NAME):
+    _LOGGER.debug("Creating fleet sensors")
+    return [
+        FleetTemperatureSensor(coordinator, organization_id, organization_name),
+        FleetSpeedSensor(coordinator, organization_id, organization_name),
+        FleetDeviceStatusSensor(coordinator, organization_id, organization_name),
+    ]
+
+
+def create_diagnostic_sensors(organization_id, data):
+    _LOGGER.debug("Creating diagnostic sensors")
+    metrics = data.get("metrics")
+    organization_name = data.get("name")
+    diagnostic_sensors = [
+        EndpointLatencySensor(metrics, organization_id, endpoint, organization_name)
+        for endpoint in DIAGNOSTICS_ENDPOINTS
+    ]
+    coordinators = [
+        ("Accounts", data.get("accounts_coordinator")),
+        ("Payouts", data.get("payouts_coordinator")),
+        ("Rigs", data.get("rigs_coordinator")),
+    ]
+    for label, coordinator in coordinators:
+        if coordinator is not None:
+            diagnostic_sensors.append(
+                CoordinatorUpdateSensor(
+                    coordinator, organization_id, label, organization_name
+                )
+            )
+
+    return diagnostic_sensors
+
+
+def create_shared_diagnostic_sensors(organization_id, shared_data):
+    """Sensors of the public endpoints, which no organization is named in"""
+    _LOGGER.debug("Creating shared diagnostic sensors")
+    metrics = shared_data.get("public_metrics")
+    diagnostic_sensors = [
+        EndpointLatencySensor(metrics, organization_id, endpoint)
+        for endpoint in DIAGNOSTICS_PUBLIC_ENDPOINTS
+    ]
+    exchange_rates_coordinator = shared_data.get("exchange_rates_coordinator")
+    if exchange_rates_coordinator is not None:
+        diagnostic_sensors.append(
+            CoordinatorUpdateSensor(
+                exchange_rates_coordinator, organization_id, "Exchange Rates"
+            )
+        )
+
+    return diagnostic_sensors
+
+
 def create_device_sensors(mining_rigs, coordinator):
     device_sensors = []
-    for rig_data in mining_rigs:
-        rig = MiningRig(rig_data)
+    for rig in mining_rigs:
         devices = rig.devices.values()
         _LOGGER.debug(
             f"Found {len(devices)} device sensor(s) for {rig.name} ({rig.id})"
         )
         for device in devices:
-            _LOGGER.debug(f"Creating {device.name} ({device.id}) sensors")
-            device_sensors.append(DeviceAlgorithmSensor(coordinator, rig, device))
-            device_sensors.append(DeviceSpeedSensor(coordinator, rig, device))
-            device_sensors.append(DeviceStatusSensor(coordinator, rig, device))
-            device_sensors.append(DeviceTemperatureSensor(coordinator, rig, device))
-            device_sensors.append(DeviceLoadSensor(coordinator, rig, device))
-            device_sensors.append(DeviceRPMSensor(coordinator, rig, device))
+            device_sensors.extend(
+                create_single_device_sensors(rig, device, coordinator)
+            )
 
     return device_sensors
+
+
+def create_single_device_sensors(rig, device, coordinator):
+    _LOGGER.debug(f"Creating {device.name} ({device.id}) sensors")
+    return [
+        DeviceAlgorithmSensor(coordinator, rig, device),
+        DeviceSpeedSensor(coordinator, rig, device),
+        DeviceStatusSensor(coordinator, rig, device),
+        DeviceTemperatureSensor(coordinator, rig, device),
+        DeviceLoadSensor(coordinator, rig, device),
+        DeviceRPMSensor(coordinator, rig, device),
+    ]
+
+
+def create_single_device_history_sensors(rig, device, coordinator):
+    _LOGGER.debug(f"Creating {device.name} ({device.id}) history sensors")
+    return [
+        DeviceHistorySensor(coordinator, rig, device, metric)
+        for metric in HISTORY_METRICS
+    ]
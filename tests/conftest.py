@@ -0,0 +1,12 @@
+"""
+Fixtures shared by the NiceHash tests
+"""
+import pytest
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Allow Home Assistant to load custom_components/nicehash"""
+    yield
@@ -0,0 +1,98 @@
+"""
+Tests for the earnings estimated from payouts
+"""
+import pytest
+
+from benchmarks.payloads import PayloadClient
+from custom_components.nicehash.const import PAYOUT_USER
+from custom_components.nicehash.coordinators import MiningPayoutsDataUpdateCoordinator
+from custom_components.nicehash.earnings import EarningsEstimator, EarningsWindow
+from custom_components.nicehash.nicehash import Payout
+
+HOUR_MS = 60 * 60 * 1000
+
+
+def make_payout(created, amount=1.0, fee=0.1, account_type=PAYOUT_USER):
+    return Payout(
+        {
+            "id": f"payout-{created}",
+            "created": created,
+            "amount": amount,
+            "feeAmount": fee,
+            "currency": {"enumName": "BTC"},
+            "accountType": {"enumName": account_type},
+        }
+    )
+
+
+def test_window_totals():
+    window = EarningsWindow(24 * 60 * 60)
+    assert len(window) == 0
+    assert window.net == 0
+    assert window.fee_ratio is None
+    assert window.average_interval_ms is None
+
+    window.add(make_payout(0, 2.0, 0.1))
+    window.add(make_payout(4 * HOUR_MS, 3.0, 0.15))
+    window.add(make_payout(12 * HOUR_MS, 5.0, 0.25))
+
+    assert len(window) == 3
+    assert window.net == pytest.approx(9.5)
+    assert window.fee_ratio == pytest.approx(0.05)
+    assert window.average_interval_ms == 6 * HOUR_MS
+
+
+def test_window_expires_old_payouts():
+    window = EarningsWindow(24 * 60 * 60)
+    window.add(make_payout(0, 2.0, 0.2))
+    window.add(make_payout(4 * HOUR_MS, 3.0, 0.3))
+
+    # A payout exactly one window old is still in it
+    window.expire(24 * HOUR_MS)
+    assert len(window) == 2
+
+    window.expire(24 * HOUR_MS + 1)
+    assert len(window) == 1
+    assert window.net == pytest.approx(2.7)
+
+    window.expire(100 * HOUR_MS)
+    assert len(window) == 0
+    assert window.amount == 0
+    assert window.fee == 0
+    assert window.fee_ratio is None
+
+
+def test_estimator_skips_other_and_older_payouts():
+    estimator = EarningsEstimator()
+
+    estimator.add(
+        [
+            make_payout(0),
+            make_payout(HOUR_MS, account_type="ORGANIZATION"),
+            make_payout(2 * HOUR_MS),
+        ]
+    )
+    # Already counted payouts arrive again when paging back, skip them
+    estimator.add([make_payout(HOUR_MS), make_payout(3 * HOUR_MS)])
+
+    for window in estimator.windows.values():
+        assert len(window) == 3
+        assert window.net == pytest.approx(2.7)
+    estimator.expire(24 * HOUR_MS + 1)
+    assert len(estimator.get_window("24h")) == 2
+    assert len(estimator.get_window("7d")) == 3
+
+
+async def test_coordinator_estimates_stored_payouts(hass):
+    client = PayloadClient(fleet=[], num_payouts=42)
+    coordinator = MiningPayoutsDataUpdateCoordinator(hass, client)
+
+    await coordinator.async_refresh()
+
+    # Payouts are 4 hours apart, the newest one was just created
+    payouts = [Payout(payout) for payout in client.payouts.get("list")]
+    day = coordinator.earnings.get_window("24h")
+    assert len(day) == 6
+    assert day.net == pytest.approx(sum(p.amount - p.fee for p in payouts[:6]))
+    assert len(coordinator.earnings.get_window("7d")) == 42
+    assert len(coordinator.earnings.get_window("30d")) == 42
@@ -0,0 +1,249 @@
+"""
+Tests for the rig and device sensors of a changing fleet
+"""
+from collections import Counter
+from datetime import timedelta
+import logging
+
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import EntityPlatform
+import pytest
+
+from benchmarks.payloads import PayloadClient, make_fleet
+from custom_components.nicehash.const import DEFAULT_NAME, DOMAIN
+from custom_components.nicehash.coordinators import MiningRigsDataUpdateCoordinator
+from custom_components.nicehash.history import HISTORY_BUCKET_SECONDS
+from custom_components.nicehash.sensor import async_setup_platform
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Fleet:
+    """Rig and device sensors of a synthetic fleet, added to Home Assistant"""
+
+    def __init__(self, hass, fleet, history=False):
+        self.hass = hass
+        self.fleet = fleet
+        self.client = PayloadClient(fleet)
+        self.coordinator = MiningRigsDataUpdateCoordinator(
+            hass, self.client, history=history
+        )
+        self.history = history
+        self.platform = EntityPlatform(
+            hass=hass,
+            logger=_LOGGER,
+            domain="sensor",
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        # States written since the last refresh, by entity id
+        self.written = dict()
+        # Entity state writes since the last refresh, by entity id
+        self.writes = Counter()
+
+    async def async_setup(self):
+        await self.coordinator.async_refresh()
+        organization_id = self.client.organization_id
+        self.hass.data[DOMAIN] = {
+            "organizations": {
+                organization_id: {
+                    "organization_id": organization_id,
+                    "name": DEFAULT_NAME,
+                    "rigs_enabled": True,
+                    "devices_enabled": True,
+                    "history_enabled": self.history,
+                    "rigs_coordinator": self.coordinator,
+                }
+            }
+        }
+
+        @callback
+        def async_add_entities(entities, update_before_add=False):
+            self.hass.async_create_task(
+                self.platform.async_add_entities(entities, update_before_add)
+            )
+
+        await async_setup_platform(
+            self.hass, {}, async_add_entities, {"organization_id": organization_id}
+        )
+        await self.hass.async_block_till_done()
+
+        @callback
+        def record_state(event):
+            new_state = event.data.get("new_state")
+            if new_state is not None:
+                self.written[event.data.get("entity_id")] = new_state.state
+
+        self.hass.bus.async_listen(EVENT_STATE_CHANGED, record_state)
+
+    def count_writes(self, monkeypatch):
+        """Count state writes, including those that change nothing"""
+        write = Entity._async_write_ha_state
+
+        def counting_write(entity):
+            self.writes[entity.entity_id] += 1
+            write(entity)
+
+        monkeypatch.setattr(Entity, "_async_write_ha_state", counting_write)
+
+    async def async_refresh(self):
+        self.written.clear()
+        self.writes.clear()
+        await self.coordinator.async_refresh()
+        await self.hass.async_block_till_done()
+
+    def get_entity_ids(self, rig_or_device_id):
+        """Entity ids of the sensors of a rig or device"""
+        return {
+            entity_id
+            for entity_id, entity in self.platform.entities.items()
+            if entity.unique_id.split(":")[0] == rig_or_device_id
+        }
+
+    def get_history_entity_ids(self, rig):
+        """Entity ids of the history sensors of the devices of a raw rig"""
+        return {
+            entity_id
+            for entity_id in self.get_rig_entity_ids(rig)
+            if self.platform.entities[entity_id].unique_id.endswith(":average")
+        }
+
+    def get_rig_entity_ids(self, rig):
+        """Entity ids of the sensors of a raw rig and its devices"""
+        entity_ids = self.get_entity_ids(rig.get("rigId"))
+        for device in rig.get("devices"):
+            entity_ids |= self.get_entity_ids(device.get("id"))
+        return entity_ids
+
+    async def async_shutdown(self):
+        await self.platform.async_reset()
+        await self.coordinator.async_shutdown()
+
+
+@pytest.fixture
+async def fleet(hass, monkeypatch):
+    fleet = Fleet(hass, make_fleet(4, 3))
+    await fleet.async_setup()
+    fleet.count_writes(monkeypatch)
+    yield fleet
+    await fleet.async_shutdown()
+
+
+@pytest.fixture
+async def history_fleet(hass, monkeypatch):
+    fleet = Fleet(hass, make_fleet(4, 3), history=True)
+    await fleet.async_setup()
+    fleet.count_writes(monkeypatch)
+    yield fleet
+    await fleet.async_shutdown()
+
+
+async def test_removed_device_sensors_are_not_written(fleet, caplog):
+    rig = fleet.fleet[0]
+    device = rig.get("devices").pop()
+    device_entity_ids = fleet.get_entity_ids(device.get("id"))
+    assert len(device_entity_ids) == 6
+
+    await fleet.async_refresh()
+
+    assert "Unable to get mining device" not in caplog.text
+    for entity_id in device_entity_ids:
+        assert fleet.written.get(entity_id, STATE_UNAVAILABLE) == STATE_UNAVAILABLE
+        assert entity_id not in fleet.platform.entities
+    # Sensors of the other devices of the rig are kept
+    for other_device in rig.get("devices"):
+        assert len(fleet.get_entity_ids(other_device.get("id"))) == 6
+
+
+async def test_removed_rig_sensors_are_not_written(fleet, caplog):
+    rig = fleet.fleet.pop(0)
+    entity_ids = fleet.get_rig_entity_ids(rig)
+    assert len(entity_ids) == 6 + 3 * 6
+
+    await fleet.async_refresh()
+
+    assert "Unable to get mining" not in caplog.text
+    for entity_id in entity_ids:
+        assert fleet.written.get(entity_id, STATE_UNAVAILABLE) == STATE_UNAVAILABLE
+        assert entity_id not in fleet.platform.entities
+    assert len(fleet.get_entity_ids(fleet.fleet[0].get("rigId"))) == 6
+
+
+async def test_unchanged_rigs_are_not_written(fleet):
+    # Entities wrote their state when added, the first update changes nothing
+    await fleet.async_refresh()
+    for rig in fleet.fleet:
+        assert not fleet.get_rig_entity_ids(rig) & fleet.writes.keys()
+
+
+async def test_changed_rig_sensors_are_written(fleet):
+    changed_rig = fleet.fleet[1]
+    changed_rig.get("devices")[0]["load"] += 1
+
+    await fleet.async_refresh()
+
+    changed_entity_ids = fleet.get_rig_entity_ids(changed_rig)
+    assert all(fleet.writes[entity_id] == 1 for entity_id in changed_entity_ids)
+    for rig in fleet.fleet:
+        if rig is not changed_rig:
+            assert not fleet.get_rig_entity_ids(rig) & fleet.writes.keys()
+
+
+async def test_every_rig_follows_update_result(fleet):
+    entity_ids = set()
+    for rig in fleet.fleet:
+        entity_ids |= fleet.get_rig_entity_ids(rig)
+
+    async def get_mining_rigs(page=0, size=None):
+        raise Exception("503: Service Unavailable")
+
+    fleet.client.get_mining_rigs = get_mining_rigs
+    await fleet.async_refresh()
+    assert all(fleet.writes[entity_id] == 1 for entity_id in entity_ids)
+    assert all(
+        fleet.written[entity_id] == STATE_UNAVAILABLE for entity_id in entity_ids
+    )
+
+    # Failing again changes nothing
+    await fleet.async_refresh()
+    assert not entity_ids & fleet.writes.keys()
+
+    del fleet.client.get_mining_rigs
+    await fleet.async_refresh()
+    assert all(fleet.writes[entity_id] == 1 for entity_id in entity_ids)
+    assert STATE_UNAVAILABLE not in fleet.written.values()
+
+
+async def test_history_sensors_follow_their_devices(history_fleet):
+    fleet = history_fleet
+    changed_rig = fleet.fleet[2]
+    changed_rig.get("devices")[1]["load"] += 1
+
+    await fleet.async_refresh()
+
+    history_entity_ids = fleet.get_history_entity_ids(changed_rig)
+    assert len(history_entity_ids) == 3 * 4
+    assert all(fleet.writes[entity_id] == 1 for entity_id in history_entity_ids)
+    for rig in fleet.fleet:
+        if rig is not changed_rig:
+            assert not fleet.get_rig_entity_ids(rig) & fleet.writes.keys()
+
+
+async def test_history_sensors_follow_rolled_over_buckets(history_fleet):
+    fleet = history_fleet
+    # Every device rolled its buckets over since the previous poll
+    fleet.coordinator.history.timestamp -= 2 * HISTORY_BUCKET_SECONDS
+
+    await fleet.async_refresh()
+
+    for rig in fleet.fleet:
+        history_entity_ids = fleet.get_history_entity_ids(rig)
+        assert all(fleet.writes[entity_id] == 1 for entity_id in history_entity_ids)
+        # Nothing else about the rig changed
+        assert fleet.writes.keys() & fleet.get_rig_entity_ids(rig) == (
+            history_entity_ids
+        )
@@ -0,0 +1,206 @@
+"""
+Tests for the rolling-window history of device readings
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.nicehash.const import HISTORY_METRICS
+from custom_components.nicehash.history import (
+    HISTORY_BUCKET_SECONDS,
+    DeviceHistory,
+    Ewma,
+    MetricHistory,
+    RollingWindow,
+)
+
+
+def make_device(speed=10.0, temperature=60, load=90.0, rpm=1200.0):
+    return SimpleNamespace(speed=speed, temperature=temperature, load=load, rpm=rpm)
+
+
+def test_window_weighs_readings_by_time_held():
+    window = RollingWindow(60, 6)
+    assert window.mean is None
+    assert window.min is None
+    assert window.max is None
+
+    window.add(0, 30, 4)
+    window.add(30, 40, 10)
+
+    assert window.seconds == 40
+    assert window.mean == pytest.approx((4 * 30 + 10 * 10) / 40)
+    assert window.min == 4
+    assert window.max == 10
+
+    # A reading held for no time doesn't count
+    window.add(40, 40, 100)
+    assert window.seconds == 40
+    assert window.max == 10
+
+
+def test_window_expires_old_buckets():
+    window = RollingWindow(60, 6)
+    window.add(0, 10, 100)
+    window.add(10, 20, 50)
+    window.add(20, 55, 10)
+    assert window.seconds == 55
+
+    # The bucket of 0-10s falls out of the window ending at 60-70s
+    window.add(55, 65, 20)
+    assert window.seconds == 55
+    assert window.mean == pytest.approx((50 * 10 + 10 * 35 + 20 * 10) / 55)
+    assert window.min == 10
+    assert window.max == 50
+
+    window.expire(75)
+    assert window.seconds == 45
+    assert window.max == 20
+
+
+def test_window_splits_readings_across_buckets():
+    window = RollingWindow(60, 6)
+    window.add(5, 35, 2)
+
+    window.expire(75)
+    # Only the seconds held in the buckets of 20-30s and 30-40s are left
+    assert window.seconds == 15
+    assert window.mean == 2
+
+
+def test_window_gap_longer_than_window():
+    window = RollingWindow(60, 6)
+    window.add(0, 30, 1)
+
+    window.add(1000, 1010, 7)
+
+    assert window.seconds == 10
+    assert window.mean == 7
+    assert window.min == 7
+
+
+def test_window_offset_shifts_buckets():
+    window = RollingWindow(60, 6, offset=5)
+    window.add(0, 10, 1)
+
+    assert window.get_bucket(4) == -1
+    assert window.get_bucket(5) == 0
+    window.expire(64)
+    assert window.seconds == 5
+    window.expire(65)
+    assert window.seconds == 0
+    assert window.mean is None
+
+
+def test_window_clock_going_back():
+    window = RollingWindow(60, 6)
+    window.add(100, 110, 1)
+
+    # Readings in buckets still in the window are counted where they belong
+    window.add(70, 80, 3)
+    assert window.seconds == 20
+    assert window.mean == 2
+    # Older ones are not
+    window.add(0, 10, 5)
+    assert window.seconds == 20
+
+
+def test_ewma_weighs_by_time_held():
+    ewma = Ewma(60)
+    ewma.add(0, 0, 10)
+    assert ewma.value == 10
+
+    ewma.add(0, 0, 20)
+    assert ewma.value == 10
+
+    ewma.add(0, 60 * 60, 20)
+    assert ewma.value == pytest.approx(20)
+
+
+def test_metric_weighs_readings_by_poll_interval():
+    history = MetricHistory()
+    history.add(None, 0, 10)
+    # A first reading is the mean until it was held for a while
+    assert history.get_mean("1h") == 10
+
+    # Readings of fast polls while they change every 20s weigh as much as
+    # the one of a single slow poll 5 minutes later
+    readings = [30.0, 10.0] * 7 + [30.0]
+    for index, reading in enumerate(readings):
+        history.add(index * 20, (index + 1) * 20, reading)
+    history.add(300, 600, 50)
+
+    window = history.windows["1h"]
+    assert window.seconds == 600
+    assert history.get_mean("1h") == pytest.approx(
+        (sum(readings) * 20 + 50 * 300) / 600
+    )
+
+
+def test_metric_holds_unchanged_readings():
+    history = MetricHistory()
+    history.add(None, 0, 10)
+    history.add(0, 60, 10)
+    history.add(60, 120, 10)
+    assert history.windows["1h"].seconds == 0
+
+    # The held reading counts up to the previous poll when it changes
+    history.add(120, 180, 40)
+    assert history.windows["1h"].seconds == 180
+    assert history.get_mean("1h") == pytest.approx((10 * 120 + 40 * 60) / 180)
+
+    summary = history.as_dict()
+    assert summary["min_1h"] == 10
+    assert summary["max_1h"] == 40
+
+
+def test_device_history_only_reads_changed_devices():
+    history = DeviceHistory()
+    devices = {"a": make_device(), "b": make_device()}
+    assert history.add(0, devices) == {"a", "b"}
+
+    devices["a"] = make_device(speed=20.0)
+    changed = history.add(60, devices, ["a"])
+    assert "a" in changed
+
+    speed = history.get("a", "speed")
+    assert speed.value == 20
+    assert speed.get_mean("1h") == 20
+    assert history.get("b", "speed").get_mean("1h") == 10
+
+
+def test_device_history_rolls_devices_over_at_their_offsets():
+    history = DeviceHistory()
+    devices = {f"device-{index}": make_device() for index in range(100)}
+    history.add(0, devices)
+
+    changed = history.add(HISTORY_BUCKET_SECONDS / 10, devices, [])
+    # Roughly one device in ten rolled over, not all of them at once
+    assert 0 < len(changed) < 30
+    # Every device rolls over once per bucket
+    assert len(history.add(HISTORY_BUCKET_SECONDS * 2, devices, [])) == 100
+
+
+def test_device_history_clock_going_back():
+    history = DeviceHistory()
+    history.add(100, {"a": make_device()})
+
+    history.add(50, {"a": make_device(speed=20.0)})
+
+    assert history.timestamp == 100
+    assert history.get("a", "speed").value == 20
+
+
+def test_device_history_forgets_removed_devices():
+    history = DeviceHistory()
+    device = make_device()
+
+    history.add(0, {"a": device, "b": device})
+    assert history.add(60, {"a": device}) == {"a"}
+
+    assert history.get("b", "speed") is None
+    for metric in HISTORY_METRICS:
+        summary = history.get("a", metric).as_dict()
+        assert summary["mean_1h"] == getattr(device, metric)
+        assert summary["min_1h"] == getattr(device, metric)
+        assert summary["ewma"] == getattr(device, metric)
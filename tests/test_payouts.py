@@ -0,0 +1,131 @@
+"""
+Tests for the payout store and the incremental payout sync
+"""
+from benchmarks.payloads import PayloadClient, make_payouts
+from custom_components.nicehash.const import DOMAIN, STORAGE_VERSION
+from custom_components.nicehash.coordinators import (
+    PAYOUTS_SYNC_PAGE_SIZE,
+    MiningPayoutsDataUpdateCoordinator,
+)
+from custom_components.nicehash.nicehash import PayoutStore
+
+PAYOUT_PERIOD_MS = 4 * 60 * 60 * 1000
+STORAGE_KEY = f"{DOMAIN}.{PayloadClient.organization_id}.payouts"
+
+
+class RecordingPayloadClient(PayloadClient):
+    """PayloadClient recording the beforeTimestamp of every payouts request"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.before_timestamps = []
+
+    async def get_rig_payouts(self, size=84, before_timestamp=None):
+        self.before_timestamps.append(before_timestamp)
+        return await super().get_rig_payouts(size, before_timestamp)
+
+    def add_newer_payouts(self, num_payouts, seed=1):
+        """Prepend payouts created after the newest one, newest first"""
+        payouts = self.payouts.get("list")
+        newest = payouts[0].get("created") + num_payouts * PAYOUT_PERIOD_MS
+        newer_payouts = make_payouts(num_payouts, seed, newest).get("list")
+        self.payouts["list"] = newer_payouts + payouts
+        return newer_payouts
+
+
+def test_store_cursor_and_order():
+    raw_payouts = make_payouts(5).get("list")
+    store = PayoutStore()
+    assert store.cursor is None
+
+    added = store.add(raw_payouts)
+
+    # Payouts arrive newest first and are stored oldest first
+    assert [payout.id for payout in added] == [p["id"] for p in reversed(raw_payouts)]
+    assert [payout.id for payout in store] == [payout.id for payout in added]
+    assert store.cursor == raw_payouts[0]["created"]
+    assert store.latest_user_payout.id == raw_payouts[0]["id"]
+
+
+def test_store_deduplicates():
+    raw_payouts = make_payouts(5).get("list")
+    store = PayoutStore()
+    store.add(raw_payouts)
+
+    assert store.add(raw_payouts) == []
+    assert len(store) == 5
+
+    # A payout created at the cursor is new unless its id is already stored
+    same_time = dict(raw_payouts[0], id="same-time-payout")
+    assert [payout.id for payout in store.add([same_time])] == ["same-time-payout"]
+    assert store.add([same_time]) == []
+    assert len(store) == 6
+
+
+def test_store_evicts_oldest():
+    raw_payouts = make_payouts(5).get("list")
+    store = PayoutStore(max_payouts=3)
+
+    store.add(raw_payouts)
+
+    assert len(store) == 3
+    assert [payout.id for payout in store] == [p["id"] for p in raw_payouts[2::-1]]
+    # Evicted payouts are older than the cursor, so they are not added back
+    assert store.add(raw_payouts[3:]) == []
+
+    newer = make_payouts(2, 1, raw_payouts[0]["created"] + 2 * PAYOUT_PERIOD_MS)
+    store.add(newer.get("list"))
+    assert len(store) == 3
+    assert store.cursor == newer.get("list")[0]["created"]
+
+
+async def test_sync_pages_back_to_stored_payouts(hass):
+    client = RecordingPayloadClient(fleet=[], num_payouts=42)
+    coordinator = MiningPayoutsDataUpdateCoordinator(hass, client)
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert len(coordinator.payouts) == 42
+
+    newer_payouts = client.add_newer_payouts(PAYOUTS_SYNC_PAGE_SIZE * 2 + 5)
+    client.before_timestamps.clear()
+    await coordinator.async_refresh()
+
+    # Full pages of new payouts continue before the oldest payout of the page
+    assert client.before_timestamps == [
+        None,
+        newer_payouts[PAYOUTS_SYNC_PAGE_SIZE - 1]["created"],
+        newer_payouts[PAYOUTS_SYNC_PAGE_SIZE * 2 - 1]["created"],
+    ]
+    assert len(coordinator.payouts) == 42 + len(newer_payouts)
+    assert coordinator.payouts.cursor == newer_payouts[0]["created"]
+
+    # Nothing new stops after the first page
+    client.before_timestamps.clear()
+    await coordinator.async_refresh()
+    assert client.before_timestamps == [None]
+    assert len(coordinator.payouts) == 42 + len(newer_payouts)
+
+
+async def test_restore_from_storage(hass, hass_storage):
+    client = RecordingPayloadClient(fleet=[], num_payouts=42)
+    store = PayoutStore()
+    store.add(client.payouts.get("list")[10:])
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "key": STORAGE_KEY,
+        "data": store.as_list(),
+    }
+
+    coordinator = MiningPayoutsDataUpdateCoordinator(hass, client)
+    assert await coordinator.async_restore_snapshot()
+    assert coordinator.stale
+    assert len(coordinator.payouts) == 32
+    assert coordinator.payouts.cursor == store.cursor
+
+    # Only payouts newer than the restored ones are fetched and stored
+    await coordinator.async_refresh()
+    assert not coordinator.stale
+    assert client.before_timestamps == [None, client.payouts["list"][9]["created"]]
+    assert len(coordinator.payouts) == 42
+    assert coordinator.payouts.cursor == client.payouts.get("list")[0]["created"]
+    assert len(hass_storage[STORAGE_KEY]["data"]) == 42
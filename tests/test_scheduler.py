@@ -0,0 +1,132 @@
+"""
+Tests for the request budgets and the handling of 429 Too Many Requests
+"""
+import time
+
+import httpx
+import pytest
+
+from benchmarks.fake_api import Faults, FakeNiceHashAPI, FakeTransport
+from benchmarks.payloads import make_fleet
+from custom_components.nicehash.const import (
+    RATE_LIMIT_DEFAULT_RETRY_AFTER,
+    RATE_LIMIT_MAX_RETRIES,
+)
+from custom_components.nicehash.nicehash import (
+    NiceHashPrivateClient,
+    RequestScheduler,
+    TokenBucket,
+    parse_retry_after,
+)
+
+RIGS_PATH = "/main/api/v2/mining/rigs2"
+
+
+def scripted_send(status_codes, retry_after="0"):
+    """send() answering with the given status codes in turn"""
+    responses = iter(status_codes)
+    calls = []
+
+    async def send():
+        status_code = next(responses)
+        calls.append(status_code)
+        headers = {"Retry-After": retry_after} if status_code == 429 else {}
+        return httpx.Response(status_code, headers=headers, content=b"{}")
+
+    return send, calls
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("0") == 0
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0
+    assert parse_retry_after(None) == RATE_LIMIT_DEFAULT_RETRY_AFTER
+    assert parse_retry_after("soon") == RATE_LIMIT_DEFAULT_RETRY_AFTER
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+async def test_bucket_bursts_up_to_capacity():
+    bucket = TokenBucket(rate=50, capacity=3)
+
+    assert [await bucket.acquire() for _ in range(3)] == [False] * 3
+
+    start = time.monotonic()
+    assert await bucket.acquire()
+    # One token refills in 1 / rate seconds
+    assert time.monotonic() - start >= 0.015
+
+
+async def test_bucket_block_holds_requests():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.block(0.05)
+
+    start = time.monotonic()
+    assert await bucket.acquire()
+    assert time.monotonic() - start >= 0.045
+
+
+async def test_schedule_retries_rate_limited_requests():
+    scheduler = RequestScheduler(budgets={"mining": (1000, 10)})
+    send, calls = scripted_send([429, 429, 200])
+
+    response = await scheduler.schedule("mining", send)
+
+    assert response.status_code == 200
+    assert calls == [429, 429, 200]
+    assert scheduler.stats["requests"] == 3
+    assert scheduler.stats["rate_limited"] == 2
+    assert scheduler.stats["retries"] == 2
+
+
+async def test_schedule_gives_up_after_max_retries():
+    scheduler = RequestScheduler(budgets={"mining": (1000, 10)})
+    send, calls = scripted_send([429] * (RATE_LIMIT_MAX_RETRIES + 2))
+
+    response = await scheduler.schedule("mining", send)
+
+    assert response.status_code == 429
+    assert len(calls) == RATE_LIMIT_MAX_RETRIES + 1
+    assert scheduler.stats["retries"] == RATE_LIMIT_MAX_RETRIES
+
+
+async def test_schedule_returns_long_retry_after():
+    scheduler = RequestScheduler(budgets={"mining": (1000, 10)})
+    send, calls = scripted_send([429, 200], retry_after="3600")
+
+    response = await scheduler.schedule("mining", send)
+
+    # Waiting an hour would stall the update, the request fails instead
+    assert response.status_code == 429
+    assert calls == [429]
+    assert scheduler.stats["retries"] == 0
+
+
+async def test_client_retries_rate_limited_requests():
+    faults = Faults(rate_limit_ratio=0.5, retry_after=0, endpoints={RIGS_PATH})
+    api = FakeNiceHashAPI(make_fleet(4, 2), faults=faults)
+    scheduler = RequestScheduler(budgets={"mining": (1000, 10)})
+    async with httpx.AsyncClient(transport=FakeTransport(api)) as http_client:
+        client = NiceHashPrivateClient(
+            *api.credentials, http_client=http_client, scheduler=scheduler
+        )
+        for _ in range(10):
+            rigs = await client.get_mining_rigs()
+            assert len(rigs.get("miningRigs")) == 4
+
+    assert scheduler.stats["rate_limited"] > 0
+    assert scheduler.stats["retries"] == scheduler.stats["rate_limited"]
+    assert api.requests[RIGS_PATH] == 10 + scheduler.stats["retries"]
+
+
+async def test_client_raises_when_rate_limited_throughout():
+    faults = Faults(rate_limit_ratio=1.0, retry_after=0, endpoints={RIGS_PATH})
+    api = FakeNiceHashAPI(make_fleet(4, 2), faults=faults)
+    scheduler = RequestScheduler(budgets={"mining": (1000, 10)})
+    async with httpx.AsyncClient(transport=FakeTransport(api)) as http_client:
+        client = NiceHashPrivateClient(
+            *api.credentials, http_client=http_client, scheduler=scheduler
+        )
+        with pytest.raises(Exception, match="429"):
+            await client.get_mining_rigs()
+
+    assert api.requests[RIGS_PATH] == RATE_LIMIT_MAX_RETRIES + 1
@@ -0,0 +1,114 @@
+"""
+Tests for sharing concurrent identical requests
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.fake_api import Faults, FakeNiceHashAPI, FakeTransport
+from benchmarks.payloads import make_fleet
+from custom_components.nicehash.nicehash import NiceHashPrivateClient, SingleFlight
+
+RIGS_PATH = "/main/api/v2/mining/rigs2"
+
+
+class Call:
+    """Coroutine function counting its calls and finishing on demand"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def test_concurrent_callers_share_one_call():
+    single_flight = SingleFlight()
+    call = Call(result={"rigs": 1})
+
+    tasks = [asyncio.ensure_future(single_flight.run("rigs", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert "rigs" in single_flight
+    call.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert call.calls == 1
+    assert single_flight.coalesced == 2
+    assert all(result is results[0] for result in results)
+    assert "rigs" not in single_flight
+
+
+async def test_keys_do_not_share_calls():
+    single_flight = SingleFlight()
+    call = Call()
+    call.release.set()
+
+    await asyncio.gather(single_flight.run("a", call), single_flight.run("b", call))
+
+    assert call.calls == 2
+    assert single_flight.coalesced == 0
+
+
+async def test_finished_call_is_not_reused():
+    single_flight = SingleFlight()
+    call = Call()
+    call.release.set()
+
+    await single_flight.run("rigs", call)
+    await single_flight.run("rigs", call)
+
+    assert call.calls == 2
+
+
+async def test_error_reaches_every_caller():
+    single_flight = SingleFlight()
+    call = Call(error=ValueError("boom"))
+
+    tasks = [asyncio.ensure_future(single_flight.run("rigs", call)) for _ in range(2)]
+    await asyncio.sleep(0)
+    call.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert call.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert "rigs" not in single_flight
+
+
+async def test_cancelled_caller_does_not_cancel_call():
+    single_flight = SingleFlight()
+    call = Call(result="done")
+
+    cancelled = asyncio.ensure_future(single_flight.run("rigs", call))
+    waiting = asyncio.ensure_future(single_flight.run("rigs", call))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    call.release.set()
+    assert await waiting == "done"
+    assert call.calls == 1
+
+
+async def test_client_coalesces_identical_requests():
+    api = FakeNiceHashAPI(make_fleet(4, 2), faults=Faults(latency=0.01))
+    async with httpx.AsyncClient(transport=FakeTransport(api)) as http_client:
+        client = NiceHashPrivateClient(*api.credentials, http_client=http_client)
+        first, second = await asyncio.gather(
+            client.get_mining_rigs(), client.get_mining_rigs()
+        )
+        # Another page is another request
+        await asyncio.gather(client.get_mining_rigs(), client.get_mining_rigs(1))
+
+    assert first is second
+    assert api.requests[RIGS_PATH] == 3
+    assert client.in_flight.coalesced == 1
+    assert client.metrics.as_dict()["rigs2"]["coalesced"] == 1